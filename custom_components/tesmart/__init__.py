@@ -5,49 +5,151 @@ https://github.com/krohrbaugh/tesmart-homeassistant
 """
 from __future__ import annotations
 
+from datetime import timedelta
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME, CONF_IP_ADDRESS, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .api import TesmartApiClient
-from .const import DOMAIN
+from .cache import TesmartStateCache
+from .const import (
+    CONF_COMMAND_TIMEOUT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_MEMBERS,
+    CONF_POLL_INTERVAL,
+    CONF_PROBE_INTERVAL,
+    CONF_SOURCE_NAMES,
+    CONF_STATUS_TIMEOUT,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_STATUS_TIMEOUT,
+    DOMAIN,
+    POLL_INTERVAL_MIN,
+)
 from .coordinator import TesmartDataUpdateCoordinator
+from .hub import TesmartHub
+from .protocol import DEFAULT_PORT
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [
     Platform.MEDIA_PLAYER,
     Platform.SELECT,
+    Platform.SENSOR,
     Platform.SWITCH,
 ]
+# A group of devices is represented by a single media player
+GROUP_PLATFORMS: list[Platform] = [Platform.MEDIA_PLAYER]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the hub shared by all devices."""
+    cache = TesmartStateCache(hass)
+    await cache.async_load()
+    hass.data[DOMAIN] = TesmartHub(cache=cache)
+    async_setup_services(hass)
+    return True
+
 
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = coordinator = TesmartDataUpdateCoordinator(
+    hub: TesmartHub = hass.data[DOMAIN]
+    if CONF_MEMBERS in entry.data:
+        # Members are resolved on use, so a group doesn't wait for them to load
+        await hass.config_entries.async_forward_entry_setups(entry, GROUP_PLATFORMS)
+        return True
+
+    client = hub.create_client(
+        name = entry.data[CONF_NAME],
+        ip_address = entry.data[CONF_IP_ADDRESS],
+        port = entry.data.get(CONF_PORT, None),
+        connect_timeout = entry.options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+        command_timeout = entry.options.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT),
+        status_timeout = entry.options.get(CONF_STATUS_TIMEOUT, DEFAULT_STATUS_TIMEOUT),
+        probe_interval = entry.options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL),
+    )
+    client.set_source_names(entry.options.get(CONF_SOURCE_NAMES, []))
+    # Connection is held open for the life of the entry
+    client.connect()
+    entry.async_on_unload(client.async_close)
+
+    coordinator = TesmartDataUpdateCoordinator(
         hass = hass,
-        client = TesmartApiClient(
-            name = entry.data[CONF_NAME],
-            ip_address = entry.data[CONF_IP_ADDRESS],
-            port = entry.data.get(CONF_PORT, None),
-        ),
+        client = client,
+        poll_interval = _poll_interval(entry),
     )
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
+    if (snapshot := hub.cache.get(entry.entry_id)) is None:
+        # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+        await coordinator.async_config_entry_first_refresh()
+    else:
+        # Create entities from the cache right away, and refresh in the background
+        client.restore(snapshot)
+        coordinator.async_set_updated_data(client.state)
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.title}"
+        )
+    # Only once setup can no longer fail, so the hub never serves a closed client
+    hub.coordinators[entry.entry_id] = coordinator
+
+    @callback
+    def async_cache_state() -> None:
+        if coordinator.last_update_success and client.input_count:
+            hub.cache.async_update(entry.entry_id, client.snapshot)
+
+    entry.async_on_unload(coordinator.async_add_listener(async_cache_state))
+    # The first refresh ran before the listener, and its state is worth caching right away
+    async_cache_state()
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
 
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Handle removal of an entry."""
+    if CONF_MEMBERS in entry.data:
+        return await hass.config_entries.async_unload_platforms(entry, GROUP_PLATFORMS)
     if unloaded := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].coordinators.pop(entry.entry_id)
     return unloaded
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget cached state of a removed entry."""
+    hass.data[DOMAIN].cache.async_remove(entry.entry_id)
+
+
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options in place; only a new device address reconnects."""
+    coordinator: TesmartDataUpdateCoordinator = hass.data[DOMAIN].coordinators[entry.entry_id]
+    client = coordinator.client
+    if (client.ip_address, client.port) != (
+        entry.data[CONF_IP_ADDRESS],
+        int(entry.data.get(CONF_PORT) or DEFAULT_PORT),
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    client.set_timeouts(
+        connect_timeout = entry.options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+        command_timeout = entry.options.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT),
+        status_timeout = entry.options.get(CONF_STATUS_TIMEOUT, DEFAULT_STATUS_TIMEOUT),
+    )
+    client.set_probe_interval(entry.options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL))
+    client.set_source_names(entry.options.get(CONF_SOURCE_NAMES, []))
+    coordinator.async_set_poll_interval(_poll_interval(entry))
+    # Publish renamed sources without waiting for the next poll
+    if coordinator.data is not None and client.is_available:
+        coordinator.async_set_updated_data(client.state)
+
+
+def _poll_interval(entry: ConfigEntry) -> timedelta:
+    return timedelta(
+        seconds = entry.options.get(CONF_POLL_INTERVAL, POLL_INTERVAL_MIN.total_seconds())
+    )
@@ -1,21 +1,37 @@
-"""Synchronous TESmart API client."""
-from typing import Any, TypedDict, TypeVar
-from collections.abc import Callable
+"""Asynchronous TESmart API client."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections.abc import Awaitable, Callable, Hashable, Mapping, Sequence
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, fields
+from functools import partial
+from typing import TypedDict
 
 from homeassistant.components.media_player import MediaPlayerState
 
-from teeheesmart import get_media_switch, MediaSwitch
-
 from .const import (
-    DATA_INPUT_COUNT,
-    DATA_OUTPUT_COUNT,
-    DATA_SOURCE_LIST,
-    DATA_SOURCE_SELECTED,
-    DATA_STATE,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_STATUS_TIMEOUT,
     LOGGER,
 )
-
-_T = TypeVar("_T")
+from .breaker import TesmartCircuitBreaker
+from .capture import TesmartCapture
+from .command_queue import TesmartCommandQueue
+from .connection import ReplyMatcher, TesmartConnection
+from .protocol import (
+    DEFAULT_PORT,
+    MAX_SUPPORTED_INPUTS,
+    Command,
+    encode_frame,
+)
+from .rtt import TesmartRttEstimator
+from .telemetry import TesmartTelemetry
+from .tracing import TesmartPhaseTimer, TesmartTracer
 
 class TesmartApiClientError(Exception):
     """Exception to indicate a general API error."""
@@ -25,111 +41,342 @@ class TesmartApiClientCommunicationError(
 ):
     """Exception to indicate a communication error."""
 
-class TesmartApiState(TypedDict):
-    """Serialized state of a media switch device."""
-
-    DATA_INPUT_COUNT: int
-    DATA_OUTPUT_COUNT: int
-    DATA_SOURCE_LIST: list[str]
-    DATA_SOURCE_SELECTED: int
-    DATA_STATE: MediaPlayerState
+class TesmartApiClientCircuitOpenError(
+    TesmartApiClientCommunicationError
+):
+    """Exception to indicate the device is failing fast after repeated errors."""
+
+@dataclass(frozen=True, slots=True)
+class TesmartApiState:
+    """Immutable state of a media switch device, as published to entities."""
+
+    input_count: int = 0
+    output_count: int = 0
+    source_list: tuple[str, ...] = ()
+    source_selected: str = '0'
+    # Source routed to each output, in output order
+    routes: tuple[str, ...] = ()
+    state: MediaPlayerState = MediaPlayerState.OFF
+    # Configuration is `None` until known
+    buzzer_enabled: bool | None = None
+    led_timeout_seconds: int | None = None
+    auto_input_detection: bool | None = None
+
+    def changed_fields(self, previous: TesmartApiState | None) -> frozenset[str]:
+        """Return the names of the fields that differ from a previous state."""
+        if previous is None:
+            return STATE_FIELDS
+        return frozenset(
+            name for name in STATE_FIELDS if getattr(self, name) != getattr(previous, name)
+        )
+
+STATE_FIELDS = frozenset(field.name for field in fields(TesmartApiState))
+
+class TesmartApiSnapshot(TypedDict):
+    """Persistable capabilities and state of a media switch device."""
+
+    input_count: int
+    output_count: int
+    selected_source: str
+    # Keyed by command ID, as a string to survive JSON serialization
+    settings: dict[str, int]
+
+class TesmartProfile(TypedDict, total=False):
+    """Desired configuration and source of a media switch device."""
+
+    source: int
+    buzzer_enabled: bool
+    led_timeout_seconds: int
+    auto_input_detection: bool
 
 class TesmartApiClient:
-    """Wraps synchronous teeheesmart client."""
+    """Speaks the TESmart Hex protocol over asyncio streams."""
 
-    _DEFAULT_STATE: TesmartApiState = {
-        DATA_INPUT_COUNT: 0,
-        DATA_OUTPUT_COUNT: 0,
-        DATA_SOURCE_LIST: [],
-        DATA_SOURCE_SELECTED: '0',
-        DATA_STATE: MediaPlayerState.OFF,
-    }
+    _DEFAULT_STATE = TesmartApiState()
 
     def __init__(
         self,
         name: str,
         ip_address: str,
         port: int | None = None,
+        io_limiter: AbstractAsyncContextManager | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        command_timeout: float = DEFAULT_COMMAND_TIMEOUT,
+        status_timeout: float = DEFAULT_STATUS_TIMEOUT,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
     ) -> None:
-        """Initialize client."""
+        """Initialize client; timeouts are deadlines in seconds per operation.
+
+        Deadlines for replies adapt to the device's round trip times once
+        known; until then, the configured timeouts apply. The device's liveness
+        is probed once it has been silent for `probe_interval` seconds.
+        """
         self._name = name
         self._ip_address = ip_address
-        self._port = port
-
-        self.__device: MediaSwitch | None = None
-        self._attr_device_url: str | None = None
+        self._port = int(port) if port else DEFAULT_PORT
+        self._command_timeout = command_timeout
+        self._status_timeout = status_timeout
+
+        self.telemetry = TesmartTelemetry()
+        self.rtt = TesmartRttEstimator()
+        self.tracer = TesmartTracer()
+        self.breaker = TesmartCircuitBreaker()
+        self._probe_task: asyncio.Task | None = None
+        # Set once closing starts; failures from then on never start a probe
+        self._closing: bool = False
+        self._probe_wakeup = asyncio.Event()
+        # Time the running operation waited in the queue, while tracing
+        self._queue_wait: float | None = None
+        self._connection = TesmartConnection(
+            host = self._ip_address,
+            port = self._port,
+            on_frame = self._handle_frame,
+            on_connection_change = self._handle_connection_change,
+            connect_timeout = connect_timeout,
+            command_timeout = command_timeout,
+            status_timeout = status_timeout,
+            probe_interval = probe_interval,
+            telemetry = self.telemetry,
+            rtt = self.rtt,
+        )
+        # Shared by every entity, so serialize and coalesce their commands
+        self._queue = TesmartCommandQueue(limiter = io_limiter)
+        self._update_listeners: list[Callable[[], None]] = []
+        self._probing_inputs: bool = False
+        # Replies to retried queries may be late replies to earlier attempts
+        self._retrying: bool = False
+        # Set while an unanswered query may still be retried
+        self._retry_pending: bool = False
 
         self._attr_input_count: int = 0
-        self._attr_output_count: int = 0
+        # The Hex protocol addresses a single output, even on matrix switches
+        self._attr_output_count: int = 1
         self._attr_selected_source: str = '0'
-        # Needs to be list[str] to avoid issues with HA frontend
-        self._attr_source_list: list[str] = []
+        self._attr_source_list: tuple[str, ...] = ()
+        # User-provided names of the inputs, in input order
+        self._source_names: tuple[str, ...] = ()
+        # Last value written for each configuration command; the device has no
+        # way to read these back
+        self._attr_settings: dict[Command, int] = {}
+        # Serve restored state until the first refresh completes
+        self._restored: bool = False
+
+    def connect(self) -> None:
+        """Open the device connection and keep it open in the background."""
+        self._connection.start()
+
+    async def async_close(self) -> None:
+        """Close the device connection."""
+        self._closing = True
+        await self._connection.async_stop()
+        # Operations already submitted now fail fast; let them settle, so that
+        # none can fail after the probe is cancelled
+        await self._queue.async_drain()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._probe_task
+            self._probe_task = None
+
+    def set_timeouts(
+        self, connect_timeout: float, command_timeout: float, status_timeout: float
+    ) -> None:
+        """Change deadlines in seconds, effective from the next operation."""
+        self._command_timeout = command_timeout
+        self._status_timeout = status_timeout
+        self._connection.set_timeouts(connect_timeout, command_timeout, status_timeout)
+
+    def set_probe_interval(self, probe_interval: float) -> None:
+        """Change the seconds of device silence after which its liveness is probed."""
+        self._connection.set_probe_interval(probe_interval)
+
+    def set_source_names(self, source_names: Sequence[str]) -> None:
+        """Name the inputs, in input order; unnamed inputs are listed by number."""
+        self._source_names = tuple(source_names)
+        self._update_source_list()
+
+    def start_capture(self) -> None:
+        """Start recording every frame exchanged with the device, discarding any earlier capture."""
+        self._connection.capture = TesmartCapture()
+
+    def stop_capture(self) -> TesmartCapture | None:
+        """Stop recording frames, returning the capture, if one was running."""
+        capture, self._connection.capture = self._connection.capture, None
+        return capture
+
+    def add_update_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Listen for state changes pushed by the device; returns a function to unsubscribe."""
+        self._update_listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            if update_callback in self._update_listeners:
+                self._update_listeners.remove(update_callback)
+
+        return remove_listener
 
-    def refresh_state(self) -> None:
+    async def async_refresh_state(self) -> None:
         """Fetch and update device state."""
-        device = self._device
-        self._device_io(device.update)
+        await self._async_run_queued(Command.QUERY_ACTIVE_INPUT, self._async_refresh_state)
 
-        if self._attr_input_count != device.input_count:
-            # Only recalculate source list when input count changes
-            self._attr_input_count = device.input_count
-            self._attr_source_list = list(
-                map(str, range(1, device.input_count + 1))
-            )
-        self._attr_output_count = device.output_count
-        self._attr_selected_source = str(device.selected_source)
+    async def async_select_source(self, source: int | str) -> bool:
+        """Select the specified input source, by number or name.
 
-    def select_source(self, source: int) -> None:
-        """Select the specified input source."""
+        The selection is applied and published to listeners optimistically, then
+        confirmed or rolled back from the device's acknowledgement. Returns
+        `true` if the device confirmed the requested source.
+        """
         try:
-            source_number = int(source)
-            self._device_io(self._device.select_source, source_number)
+            source_number = (
+                self._attr_source_list.index(source) + 1
+                if source in self._attr_source_list
+                else int(source)
+            )
         except ValueError as exception:
             msg = f"Invalid source identifier '{source}'."
             LOGGER.warning(msg)
             raise TesmartApiClientError(msg) from exception
 
-    def set_buzzer_muting(self, mute_buzzer: bool) -> None:
+        return await self._async_run_queued(
+            Command.SWITCH_VIDEO,
+            partial(self._async_select_source, self._normalized_source(source_number)),
+            replace = True,
+        )
+
+    async def _async_select_source(self, source_number: int) -> bool:
+        previous_source = self._attr_selected_source
+        requested_source = str(source_number)
+        self._set_selected_source(requested_source)
+        try:
+            # Replies update the selected source, rolling back a rejected selection
+            reply = await self._async_device_io(
+                encode_frame(Command.SWITCH_VIDEO, source_number)
+            )
+            if reply is None:
+                # No acknowledgement; ask the device which source is active
+                reply = await self._async_query(encode_frame(Command.QUERY_ACTIVE_INPUT))
+        except TesmartApiClientError:
+            self._set_selected_source(previous_source)
+            raise
+
+        if reply is None:
+            self._set_selected_source(previous_source)
+        return self._attr_selected_source == requested_source
+
+    async def async_set_routes(self, routes: Mapping[int | str, int | str]) -> bool:
+        """Route a source to each of the specified outputs, in a single write.
+
+        Returns `true` if the device confirmed every requested route.
+        """
+        if not routes:
+            return True
+        for output in routes:
+            if not 1 <= int(output) <= self._attr_output_count:
+                msg = f"Output '{output}' is not routable on device '{self._name}'."
+                raise TesmartApiClientError(msg)
+        # The Hex protocol has no output address, so its switch command routes
+        # the only output there is
+        return await self.async_select_source(routes[next(iter(routes))])
+
+    async def async_apply_profile(self, profile: TesmartProfile) -> int:
+        """Apply a desired configuration and source in a single pipelined write.
+
+        Only settings that differ from the known state are sent. Returns the
+        number of frames sent.
+        """
+        # Each profile is distinct, so never coalesce them
+        return await self._async_run_queued(
+            object(), partial(self._async_apply_profile, profile)
+        )
+
+    async def async_set_buzzer_muting(self, mute_buzzer: bool) -> None:
         """Configure button muting."""
-        self._device_io(self._device.set_buzzer_muting, mute_buzzer)
+        await self._async_write_setting(Command.MUTE_BUZZER, int(not mute_buzzer))
 
-    def set_led_timeout_seconds(self, led_timeout_seconds: int) -> None:
+    async def async_set_led_timeout_seconds(self, led_timeout_seconds: int) -> None:
         """Configure LED timeout."""
-        try:
-            self._device_io(self._device.set_led_timeout_seconds, led_timeout_seconds)
-        except ValueError as exception:
-            msg = f"Invalid timeout setting '{led_timeout_seconds}'."
-            LOGGER.warning(msg)
-            raise TesmartApiClientError(msg) from exception
+        await self._async_write_setting(
+            Command.LED_TIMEOUT_SECONDS, _led_timeout_value(led_timeout_seconds)
+        )
 
-    def set_auto_input_detection(self, enable_auto_input_detection: bool) -> None:
+    async def async_set_auto_input_detection(
+        self, enable_auto_input_detection: bool
+    ) -> None:
         """Configure auto input detection."""
-        self._device_io(self._device.set_auto_input_detection, enable_auto_input_detection)
+        await self._async_write_setting(
+            Command.ENABLE_INPUT_DETECTION, int(enable_auto_input_detection)
+        )
 
     @property
     def state(self) -> TesmartApiState:
-        """Current device state serialized to a dictionary."""
-        if not self.is_connected:
+        """Current device state."""
+        if not self.is_connected and not self._restored:
             return self._DEFAULT_STATE
 
+        return TesmartApiState(
+            input_count = self.input_count,
+            output_count = self.output_count,
+            source_list = self._attr_source_list,
+            source_selected = self.selected_source,
+            routes = self.routes,
+            state = MediaPlayerState.ON,
+            buzzer_enabled = self.buzzer_enabled,
+            led_timeout_seconds = self.led_timeout_seconds,
+            auto_input_detection = self.auto_input_detection,
+        )
+
+    @property
+    def snapshot(self) -> TesmartApiSnapshot:
+        """Capabilities and state to persist across restarts."""
         return {
-            DATA_INPUT_COUNT: self.input_count,
-            DATA_OUTPUT_COUNT: self.output_count,
-            DATA_SOURCE_LIST: self.source_list,
-            DATA_SOURCE_SELECTED: self.selected_source,
-            DATA_STATE: MediaPlayerState.ON
+            "input_count": self._attr_input_count,
+            "output_count": self._attr_output_count,
+            "selected_source": self._attr_selected_source,
+            "settings": {
+                str(int(command)): value for command, value in self._attr_settings.items()
+            },
+        }
+
+    def restore(self, snapshot: TesmartApiSnapshot) -> None:
+        """Restore persisted capabilities and state, avoiding discovery on startup."""
+        self._set_input_count(snapshot["input_count"])
+        self._attr_output_count = snapshot["output_count"]
+        self._attr_selected_source = snapshot["selected_source"]
+        self._attr_settings = {
+            Command(int(command)): value
+            for command, value in snapshot["settings"].items()
         }
+        self._restored = True
 
     @property
     def is_connected(self) -> bool:
-        """Returns `true` if connection to device was successful; `false` otherwise."""
-        return self._device is not None
+        """Returns `true` if connection to device is open; `false` otherwise."""
+        return self._connection.connected
+
+    @property
+    def is_available(self) -> bool:
+        """Returns `true` if the device is connected and its breaker is closed."""
+        return self.is_connected and self.breaker.is_closed
 
     @property
     def name(self) -> str:
         """Returns the user-provided device name."""
         return self._name
 
+    @property
+    def ip_address(self) -> str:
+        """Returns the IP address or hostname of the device."""
+        return self._ip_address
+
+    @property
+    def port(self) -> int:
+        """Returns the TCP port of the device."""
+        return self._port
+
+    @property
+    def status_timeout(self) -> float:
+        """Returns the configured status query deadline, used until round trip times are known."""
+        return self._status_timeout
+
     @property
     def input_count(self) -> int:
         """Returns the number of inputs the device supports."""
@@ -146,42 +393,374 @@ class TesmartApiClient:
         return self._attr_selected_source
 
     @property
-    def source_list(self) -> list[int]:
-        """Returns the list of selectable sources."""
-        return self._attr_source_list
+    def routes(self) -> tuple[str, ...]:
+        """Returns the source routed to each output, in output order."""
+        return (self._attr_selected_source,)
 
     @property
-    def _device_url(self) -> str:
-        # Builds device connection URL as required by `teeheesmart`
-        if self._attr_device_url is None:
-            self._attr_device_url = f"tcp://{self._ip_address}"
-            if self._port is not None:
-                self._attr_device_url = f"{self._attr_device_url}:{self._port}"
+    def source_list(self) -> list[str]:
+        """Returns the names of the selectable sources, in input order."""
+        # Needs to be list[str] to avoid issues with HA frontend
+        return list(self._attr_source_list)
 
-        return self._attr_device_url
+    @property
+    def buzzer_enabled(self) -> bool | None:
+        """Returns whether the buzzer is enabled, or `None` if unknown."""
+        return self._setting(Command.MUTE_BUZZER, bool)
 
     @property
-    def _device(self) -> MediaSwitch:
-        if self.__device is None:
-            self.__device = self._device_io(get_media_switch, self._device_url)
+    def led_timeout_seconds(self) -> int | None:
+        """Returns the LED timeout, or `None` if unknown."""
+        return self._setting(Command.LED_TIMEOUT_SECONDS, int)
 
-        return self.__device
+    @property
+    def auto_input_detection(self) -> bool | None:
+        """Returns whether auto input detection is enabled, or `None` if unknown."""
+        return self._setting(Command.ENABLE_INPUT_DETECTION, bool)
+
+    def _setting[T](self, command: Command, convert: Callable[[int], T]) -> T | None:
+        value = self._attr_settings.get(command)
+        return None if value is None else convert(value)
+
+    @property
+    def _device_url(self) -> str:
+        return f"tcp://{self._ip_address}:{self._port}"
 
-    def _device_io(self, target: Callable[..., _T], *args: Any) -> _T:
-        """Wrap all I/O operations so that errors are translated correctly."""
+    async def _async_run_queued[T](
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[T]],
+        replace: bool = False,
+    ) -> T:
+        if not self.tracer.enabled:
+            return await self._queue.async_run(key, operation, replace)
+
+        submitted = time.perf_counter()
+
+        async def traced_operation() -> T:
+            # Attributed to the first I/O of the operation
+            self._queue_wait = time.perf_counter() - submitted
+            try:
+                return await operation()
+            finally:
+                self._queue_wait = None
+
+        return await self._queue.async_run(key, traced_operation, replace)
+
+    async def _async_refresh_state(self) -> None:
+        try:
+            if await self._async_query(encode_frame(Command.QUERY_ACTIVE_INPUT)) is None:
+                # Unlike commands, status queries are always answered
+                raise TesmartApiClientCommunicationError(
+                    f"Device '{self._name}' at {self._device_url} did not answer status query"
+                )
+
+            if self._attr_input_count == 0:
+                await self._async_determine_input_count()
+        finally:
+            self._restored = False
+
+    async def _async_write_setting(self, command: Command, value: int) -> None:
+        # Only the newest of a burst of writes to the same setting is sent
+        await self._async_run_queued(
+            command,
+            partial(self._async_apply_settings, {command: value}),
+            replace = True,
+        )
+
+    async def _async_apply_settings(self, settings: dict[Command, int]) -> None:
+        # Configuration commands are never acknowledged
+        await self._async_pipeline_io(
+            [encode_frame(command, value) for command, value in settings.items()]
+        )
+        self._update_settings(settings)
+
+    async def _async_apply_profile(self, profile: TesmartProfile) -> int:
+        desired: dict[Command, int] = {}
+        if "buzzer_enabled" in profile:
+            desired[Command.MUTE_BUZZER] = int(profile["buzzer_enabled"])
+        if "led_timeout_seconds" in profile:
+            desired[Command.LED_TIMEOUT_SECONDS] = _led_timeout_value(
+                profile["led_timeout_seconds"]
+            )
+        if "auto_input_detection" in profile:
+            desired[Command.ENABLE_INPUT_DETECTION] = int(profile["auto_input_detection"])
+        settings = {
+            command: value
+            for command, value in desired.items()
+            if self._attr_settings.get(command) != value
+        }
+        frames = [encode_frame(command, value) for command, value in settings.items()]
+
+        source_number: int | None = None
+        if "source" in profile:
+            source_number = self._normalized_source(profile["source"])
+            if str(source_number) == self._attr_selected_source:
+                source_number = None
+            else:
+                # Switch last, so that its acknowledgement is the only reply
+                frames.append(encode_frame(Command.SWITCH_VIDEO, source_number))
+
+        if not frames:
+            return 0
+
+        previous_source = self._attr_selected_source
+        if source_number is not None:
+            self._set_selected_source(str(source_number))
+        try:
+            replies = await self._async_pipeline_io(
+                frames, expected_replies = int(source_number is not None)
+            )
+            if source_number is not None and not replies:
+                reply = await self._async_query(encode_frame(Command.QUERY_ACTIVE_INPUT))
+                if reply is None:
+                    self._set_selected_source(previous_source)
+        except TesmartApiClientError:
+            self._set_selected_source(previous_source)
+            raise
+
+        self._update_settings(settings)
+        return len(frames)
+
+    async def _async_determine_input_count(self) -> None:
+        # The protocol has no capability query, so find the highest valid input
+        # by selecting each in turn; the device only acknowledges valid inputs.
+        previous_source = self._attr_selected_source
+        # Probe replies are not real source changes, so don't push them
+        self._probing_inputs = True
         try:
-            result = target(*args)
-        except (TimeoutError, ConnectionRefusedError) as exception:
-            self.__device = None
+            for source in range(MAX_SUPPORTED_INPUTS, 0, -1):
+                # Late replies to earlier queries report the input already
+                # selected, so only this selection's acknowledgement counts
+                reply = await self._async_device_io(
+                    encode_frame(Command.SWITCH_VIDEO, source),
+                    match = _acknowledges_source(source),
+                )
+                if reply is not None:
+                    self._set_input_count(source)
+                    break
+
+            # Restore previously selected input
+            if previous_source != '0':
+                await self._async_device_io(
+                    encode_frame(Command.SWITCH_VIDEO, int(previous_source))
+                )
+        finally:
+            self._probing_inputs = False
+
+    def _normalized_source(self, source_number: int) -> int:
+        source_number = max(source_number, 1)
+        if self._attr_input_count > 0:
+            source_number = min(source_number, self._attr_input_count)
+        return source_number
+
+    def _set_input_count(self, input_count: int) -> None:
+        if self._attr_input_count != input_count:
+            # Only recalculate source list when input count changes
+            self._attr_input_count = input_count
+            self._update_source_list()
+
+    def _update_source_list(self) -> None:
+        names = self._source_names
+        self._attr_source_list = tuple(
+            names[index] if index < len(names) and names[index] else str(index + 1)
+            for index in range(self._attr_input_count)
+        )
+
+    def _handle_frame(self, command: int, value: int) -> None:
+        # Called for every frame the device sends, whether solicited or not
+        match command:
+            case Command.CURRENT_ACTIVE_INPUT:
+                self._set_selected_source(str(value + 1))
+            case _:
+                LOGGER.debug("Discarded frame %02x:%02x from '%s'", command, value, self._name)
+
+    def _update_settings(self, settings: dict[Command, int]) -> None:
+        if any(self._attr_settings.get(command) != value for command, value in settings.items()):
+            self._attr_settings.update(settings)
+            self._notify_update_listeners()
+
+    def _set_selected_source(self, selected_source: str) -> None:
+        if selected_source != self._attr_selected_source:
+            self._attr_selected_source = selected_source
+            if not self._probing_inputs:
+                self._notify_update_listeners()
+
+    def _handle_connection_change(self, connected: bool) -> None:
+        LOGGER.debug(
+            "Device '%s' %s", self._name, "connected" if connected else "disconnected"
+        )
+        if connected:
+            # A reconnected device is worth probing right away
+            self._probe_wakeup.set()
+        self._notify_update_listeners()
+
+    def _record_failure(self) -> None:
+        if self.breaker.record_failure():
+            LOGGER.warning(
+                "Device '%s' failed %s consecutive operations; failing fast until it recovers",
+                self._name, self.breaker.failures,
+            )
+            if not self._closing:
+                self._probe_wakeup.clear()
+                self._probe_task = asyncio.create_task(
+                    self._async_probe(), name=f"tesmart breaker probe {self._name}"
+                )
+            self._notify_update_listeners()
+
+    def _record_success(self) -> None:
+        if self.breaker.record_success():
+            LOGGER.info("Device '%s' recovered", self._name)
+            self._notify_update_listeners()
+
+    async def _async_probe(self) -> None:
+        # Runs while the breaker is open, and is the only I/O allowed through
+        probe_frame = encode_frame(Command.QUERY_ACTIVE_INPUT)
+        while not self.breaker.is_closed:
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout(self.breaker.probe_in):
+                    await self._probe_wakeup.wait()
+            self._probe_wakeup.clear()
+            self.breaker.half_open()
+            try:
+                reply = await self._connection.async_send(
+                    probe_frame, timeout = self.rtt.timeout(self._status_timeout)
+                )
+            except (TimeoutError, OSError):
+                reply = None
+            if reply is None:
+                self.breaker.record_failure()
+            else:
+                self._record_success()
+        self._probe_task = None
+
+    def _notify_update_listeners(self) -> None:
+        for update_callback in list(self._update_listeners):
+            update_callback()
+
+    async def _async_query(self, frame: bytes) -> tuple[int, int] | None:
+        """Send an idempotent query, retrying it with jitter while unanswered.
+
+        Retries are bounded by the device's retry budget. Commands change
+        device state, so they are never retried.
+        """
+        retries = self.rtt.retries(self._status_timeout)
+        reply = None
+        for attempt in range(retries + 1):
+            self._retrying = attempt > 0
+            # Only a query left unanswered by every attempt counts as a failure
+            self._retry_pending = attempt < retries
+            try:
+                # Jitter keeps retries from many devices from bunching up
+                reply = await self._async_device_io(
+                    frame, jitter = self.rtt.timeout(self._status_timeout) if attempt else 0.0
+                )
+            finally:
+                self._retrying = self._retry_pending = False
+            if reply is not None:
+                break
+        return reply
+
+    async def _async_device_io(
+        self,
+        frame: bytes,
+        expect_reply: bool = True,
+        match: ReplyMatcher | None = None,
+        jitter: float = 0.0,
+    ) -> tuple[int, int] | None:
+        replies = await self._async_pipeline_io([frame], int(expect_reply), match, jitter)
+        return replies[0] if replies else None
+
+    async def _async_pipeline_io(
+        self,
+        frames: Sequence[bytes],
+        expected_replies: int = 0,
+        match: ReplyMatcher | None = None,
+        jitter: float = 0.0,
+    ) -> list[tuple[int, int]]:
+        """Wrap all I/O operations so that errors are translated, timed and traced."""
+        if not self.breaker.is_closed:
+            raise TesmartApiClientCircuitOpenError(
+                f"Device '{self._name}' at {self._device_url} is unreachable after"
+                f" {self.breaker.failures} failures; next check in"
+                f" {self.breaker.probe_in:.0f}s"
+            )
+        # A pipeline is named after its last frame, whose reply arrives last
+        last_command = Command(frames[-1][3])
+        command = last_command.name.lower()
+        initial_timeout = (
+            self._status_timeout
+            if last_command is Command.QUERY_ACTIVE_INPUT
+            else self._command_timeout
+        )
+        timer: TesmartPhaseTimer | None = None
+        if self.tracer.enabled:
+            timer = TesmartPhaseTimer(queue_wait = self._queue_wait)
+            self._queue_wait = None
+        started = time.monotonic()
+        try:
+            replies = await self._connection.async_send_many(
+                frames,
+                expected_replies,
+                timer,
+                # Writes that expect no reply use the connection's default
+                timeout = self.rtt.timeout(initial_timeout) if expected_replies else None,
+                sample_rtt = bool(expected_replies) and not self._retrying,
+                match = match,
+                jitter = jitter,
+            )
+        except (TimeoutError, OSError) as exception:
+            if isinstance(exception, TimeoutError):
+                self.telemetry.record_timeout()
+                self.rtt.record_timeout()
+            else:
+                self.telemetry.record_error()
+            self._record_failure()
+            if timer is not None:
+                self.tracer.record(command, timer, frames = len(frames), error = str(exception))
             raise TesmartApiClientCommunicationError(
-                f"Failed connecting to device '{self._name}' at {self._device_url}:"
+                f"Failed communicating with device '{self._name}' at {self._device_url}:"
                 f" {exception}"
             ) from exception
         except Exception as exception:
-            self.__device = None
+            if timer is not None:
+                self.tracer.record(command, timer, frames = len(frames), error = str(exception))
             raise TesmartApiClientError(
-                f"Unknown error connecting to device '{self._name}' at {self._device_url}: "
+                f"Unknown error communicating with device '{self._name}' at {self._device_url}:"
                 f" {exception}"
             ) from exception
 
-        return result
+        if timer is not None:
+            self.tracer.record(
+                command, timer, frames = len(frames), replies = len(replies)
+            )
+        if len(replies) < expected_replies:
+            # Probing expects invalid inputs to go unanswered
+            if not self._probing_inputs:
+                self.telemetry.record_timeout()
+                self.rtt.record_timeout()
+                if not self._retry_pending:
+                    self._record_failure()
+        elif expected_replies:
+            # Only a reply proves the device is responding; writes that expect
+            # none are not round trips
+            self.telemetry.record_success(command, time.monotonic() - started)
+            self._record_success()
+        return replies
+
+
+def _acknowledges_source(source_number: int) -> ReplyMatcher:
+    # A selection is acknowledged with the newly active input
+    def match(command: int, value: int) -> bool:
+        return command == Command.CURRENT_ACTIVE_INPUT and value == source_number - 1
+
+    return match
+
+
+def _led_timeout_value(led_timeout_seconds: int) -> int:
+    # The device only supports a few timeouts, and 0 turns the timeout off
+    if led_timeout_seconds not in (0, 10, 30):
+        msg = f"Invalid timeout setting '{led_timeout_seconds}'."
+        LOGGER.warning(msg)
+        raise TesmartApiClientError(msg)
+    return led_timeout_seconds
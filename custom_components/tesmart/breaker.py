@@ -0,0 +1,85 @@
+"""Per-device circuit breaker."""
+from __future__ import annotations
+
+import time
+from enum import StrEnum
+
+from .const import (
+    DEFAULT_BREAKER_BACKOFF_MAX,
+    DEFAULT_BREAKER_BACKOFF_MIN,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+)
+
+
+class BreakerState(StrEnum):
+    """Circuit breaker states."""
+
+    # Operations reach the device
+    CLOSED = "closed"
+    # Operations fail immediately until the next probe is due
+    OPEN = "open"
+    # A single probe is checking whether the device is back
+    HALF_OPEN = "half_open"
+
+
+class TesmartCircuitBreaker:
+    """Trips after consecutive failures, so an unreachable device fails fast.
+
+    Once open, the device is probed on an exponential backoff schedule; the
+    breaker closes on the first successful probe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        backoff_min: float = DEFAULT_BREAKER_BACKOFF_MIN,
+        backoff_max: float = DEFAULT_BREAKER_BACKOFF_MAX,
+    ) -> None:
+        """Initialize breaker, closed."""
+        self.failure_threshold = failure_threshold
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self._backoff_min = backoff_min
+        self._backoff_max = backoff_max
+        self._backoff = backoff_min
+        self._probe_at = 0.0
+
+    @property
+    def is_closed(self) -> bool:
+        """Returns `true` if operations may reach the device."""
+        return self.state is BreakerState.CLOSED
+
+    @property
+    def probe_in(self) -> float:
+        """Returns the seconds until the next probe is due."""
+        return max(self._probe_at - time.monotonic(), 0.0)
+
+    def record_success(self) -> bool:
+        """Record a successful operation; returns `true` if the breaker closed."""
+        self.failures = 0
+        self._backoff = self._backoff_min
+        if self.state is BreakerState.CLOSED:
+            return False
+        self.state = BreakerState.CLOSED
+        return True
+
+    def record_failure(self) -> bool:
+        """Record a failed operation; returns `true` if the breaker opened."""
+        self.failures += 1
+        match self.state:
+            case BreakerState.HALF_OPEN:
+                # Probe failed, so wait longer before the next one
+                self._backoff = min(self._backoff * 2, self._backoff_max)
+                self._open()
+            case BreakerState.CLOSED if self.failures >= self.failure_threshold:
+                self._open()
+                return True
+        return False
+
+    def half_open(self) -> None:
+        """Allow a single probe through."""
+        self.state = BreakerState.HALF_OPEN
+
+    def _open(self) -> None:
+        self.state = BreakerState.OPEN
+        self._probe_at = time.monotonic() + self._backoff
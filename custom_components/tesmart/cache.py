@@ -0,0 +1,47 @@
+"""Persisted cache of device capabilities and state."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import TesmartApiSnapshot
+from .const import STORAGE_KEY, STORAGE_SAVE_DELAY, STORAGE_VERSION
+
+
+class TesmartStateCache:
+    """Remembers the last known capabilities and state of each device.
+
+    Lets entries set up from the cache without waiting on the device.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize cache."""
+        self._store: Store[dict[str, TesmartApiSnapshot]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY
+        )
+        self._data: dict[str, TesmartApiSnapshot] = {}
+
+    async def async_load(self) -> None:
+        """Load cached snapshots from storage."""
+        self._data = await self._store.async_load() or {}
+
+    def get(self, entry_id: str) -> TesmartApiSnapshot | None:
+        """Return the cached snapshot for the entry, if any."""
+        return self._data.get(entry_id)
+
+    @callback
+    def async_update(self, entry_id: str, snapshot: TesmartApiSnapshot) -> None:
+        """Cache the snapshot, saving it to storage shortly if it changed."""
+        if self._data.get(entry_id) != snapshot:
+            self._data[entry_id] = snapshot
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget the entry's snapshot."""
+        if self._data.pop(entry_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, TesmartApiSnapshot]:
+        return self._data
@@ -0,0 +1,86 @@
+"""Wire-level capture of device sessions, for replay without hardware."""
+from __future__ import annotations
+
+import struct
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+
+from .const import CAPTURE_MAX_RECORDS, LOGGER
+from .protocol import FRAME_SIZE
+
+CAPTURE_MAGIC = b"TSMC"
+CAPTURE_VERSION = 1
+CAPTURE_FILE_SUFFIX = ".tscap"
+
+# Magic, version, and wall clock time the capture started
+_HEADER = struct.Struct("<4sBd")
+# Seconds since the capture started, direction, and the frame itself
+_RECORD = struct.Struct(f"<dB{FRAME_SIZE}s")
+
+
+class CaptureDirection(IntEnum):
+    """Direction of a captured frame, as seen from the client."""
+
+    SENT = 0
+    RECEIVED = 1
+
+
+@dataclass(frozen=True, slots=True)
+class TesmartCaptureRecord:
+    """One captured frame."""
+
+    # Seconds since the capture started
+    time: float
+    direction: CaptureDirection
+    frame: bytes
+
+
+class TesmartCapture:
+    """Records every frame exchanged with a device, in a compact binary format.
+
+    Records are kept in memory, so capturing never waits on disk I/O; once
+    `max_records` are recorded, later frames are dropped.
+    """
+
+    def __init__(self, max_records: int = CAPTURE_MAX_RECORDS) -> None:
+        """Start capturing."""
+        self.max_records = max_records
+        self.records = 0
+        self.started = time.time()
+        self._start = time.monotonic()
+        self._data = bytearray(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, self.started))
+
+    @property
+    def truncated(self) -> bool:
+        """Returns `true` if frames were dropped because the capture is full."""
+        return self.records >= self.max_records
+
+    def record(self, direction: CaptureDirection, frame: bytes) -> None:
+        """Record a frame sent or received now."""
+        if self.records >= self.max_records:
+            return
+        self.records += 1
+        self._data += _RECORD.pack(time.monotonic() - self._start, direction, frame)
+        if self.records == self.max_records:
+            LOGGER.warning("Capture is full after %s frames; dropping the rest", self.records)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the capture, ready to be written to a file."""
+        return bytes(self._data)
+
+
+def read_capture(data: bytes) -> list[TesmartCaptureRecord]:
+    """Parse a serialized capture, raising `ValueError` if it is not one."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Capture is truncated")
+    magic, version, _ = _HEADER.unpack_from(data)
+    if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+        raise ValueError(f"Not a version {CAPTURE_VERSION} capture")
+    body = memoryview(data)[_HEADER.size:]
+    if len(body) % _RECORD.size:
+        raise ValueError("Capture is truncated")
+    return [
+        TesmartCaptureRecord(timestamp, CaptureDirection(direction), frame)
+        for timestamp, direction, frame in _RECORD.iter_unpack(body)
+    ]
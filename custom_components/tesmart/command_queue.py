@@ -0,0 +1,102 @@
+"""Per-device command queue."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Awaitable, Callable, Hashable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class _QueuedCommand[T]:
+    operation: Callable[[], Awaitable[T]]
+    future: asyncio.Future[T]
+    # Callers still waiting for the result
+    waiters: int = 1
+    task: asyncio.Task[None] | None = None
+
+
+class TesmartCommandQueue:
+    """Serializes device operations, coalescing those that are still queued.
+
+    Operations run one at a time, in submission order. An operation submitted
+    while one with the same key is still waiting is merged into it and shares
+    its result: reads reuse the queued operation, while writes (`replace=True`)
+    replace it so that only the newest reaches the device.
+    """
+
+    def __init__(self, limiter: AbstractAsyncContextManager | None = None) -> None:
+        """Initialize queue; `limiter` is entered around each operation."""
+        self._lock = asyncio.Lock()
+        self._limiter = limiter or contextlib.nullcontext()
+        self._queued: dict[Hashable, _QueuedCommand[Any]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def async_run[T](
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[T]],
+        replace: bool = False,
+    ) -> T:
+        """Run the operation once all previously submitted ones have finished.
+
+        Cancelling a caller only cancels the operation once no merged caller
+        is left waiting for it.
+        """
+        if not self._lock.locked() and not self._tasks:
+            # Idle, so it runs right away; only waiting operations are merged into
+            async with self._lock, self._limiter:
+                return await operation()
+
+        if (queued := self._queued.get(key)) is not None:
+            if replace:
+                queued.operation = operation
+            queued.waiters += 1
+        else:
+            queued = _QueuedCommand(operation, asyncio.get_running_loop().create_future())
+            self._queued[key] = queued
+            # Run by a task no caller owns, so that cancelling the caller that
+            # submitted it never cancels the result merged callers share
+            queued.task = asyncio.create_task(self._async_execute(key, queued))
+            self._tasks.add(queued.task)
+            queued.task.add_done_callback(self._tasks.discard)
+
+        try:
+            return await asyncio.shield(queued.future)
+        except asyncio.CancelledError:
+            queued.waiters -= 1
+            if not queued.waiters and queued.task is not None:
+                queued.task.cancel()
+            raise
+
+    async def async_drain(self) -> None:
+        """Wait for every operation submitted so far to finish."""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+        # Including one that ran right away
+        async with self._lock:
+            pass
+
+    async def _async_execute(self, key: Hashable, queued: _QueuedCommand[Any]) -> None:
+        try:
+            async with self._lock:
+                # Now running; later submissions queue behind it
+                self._dequeue(key, queued)
+                async with self._limiter:
+                    result = await queued.operation()
+        except asyncio.CancelledError:
+            self._dequeue(key, queued)
+            queued.future.cancel()
+            raise
+        except Exception as exception:
+            queued.future.set_exception(exception)
+            # Only merged callers need to see it
+            queued.future.exception()
+        else:
+            queued.future.set_result(result)
+
+    def _dequeue(self, key: Hashable, queued: _QueuedCommand[Any]) -> None:
+        if self._queued.get(key) is queued:
+            del self._queued[key]
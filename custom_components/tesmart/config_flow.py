@@ -5,14 +5,36 @@ from typing import TypedDict
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_NAME, CONF_IP_ADDRESS, CONF_PORT
-from homeassistant.helpers import selector
+from homeassistant.core import callback
+from homeassistant.helpers import discovery_flow, selector
 
 from .api import (
     TesmartApiClient,
     TesmartApiClientCommunicationError,
     TesmartApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .const import (
+    CONF_COMMAND_TIMEOUT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_MEMBERS,
+    CONF_NETWORK,
+    CONF_POLL_INTERVAL,
+    CONF_PROBE_INTERVAL,
+    CONF_SOURCE_NAMES,
+    CONF_STATUS_TIMEOUT,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_STATUS_TIMEOUT,
+    DOMAIN,
+    LOGGER,
+    NAME,
+    POLL_INTERVAL_FAST,
+    POLL_INTERVAL_MAX,
+    POLL_INTERVAL_MIN,
+)
+from .discovery import TesmartDiscoveredDevice, async_scan, scan_hosts
+from .protocol import DEFAULT_PORT
 
 class TesmartConfigInput(TypedDict):
     """Configuration input structure."""
@@ -47,16 +69,169 @@ CONFIG_SCHEMA = vol.Schema(
     }
 )
 
+SCAN_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_NETWORK,
+        ): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.TEXT
+            )
+        ),
+        vol.Optional(
+            CONF_PORT,
+        ): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.NUMBER
+            )
+        )
+    }
+)
+
+RECONFIGURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_IP_ADDRESS,
+        ): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.TEXT
+            )
+        ),
+        vol.Optional(
+            CONF_PORT,
+        ): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.NUMBER
+            )
+        )
+    }
+)
+
+DISCOVERY_CONFIRM_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_NAME,
+        ): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.TEXT
+            )
+        ),
+    }
+)
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Required(
+            CONF_POLL_INTERVAL,
+            default=POLL_INTERVAL_MIN.total_seconds(),
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=POLL_INTERVAL_FAST.total_seconds(),
+                max=POLL_INTERVAL_MAX.total_seconds(),
+                step=5,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Required(
+            CONF_PROBE_INTERVAL,
+            default=DEFAULT_PROBE_INTERVAL,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=1,
+                max=300,
+                step=1,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Optional(
+            CONF_SOURCE_NAMES,
+            default=[],
+        ): selector.TextSelector(
+            selector.TextSelectorConfig(
+                type=selector.TextSelectorType.TEXT,
+                multiple=True,
+            )
+        ),
+        vol.Required(
+            CONF_CONNECT_TIMEOUT,
+            default=DEFAULT_CONNECT_TIMEOUT,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0.5,
+                max=60,
+                step=0.5,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Required(
+            CONF_COMMAND_TIMEOUT,
+            default=DEFAULT_COMMAND_TIMEOUT,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0.05,
+                max=10,
+                step=0.05,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+        vol.Required(
+            CONF_STATUS_TIMEOUT,
+            default=DEFAULT_STATUS_TIMEOUT,
+        ): selector.NumberSelector(
+            selector.NumberSelectorConfig(
+                min=0.05,
+                max=10,
+                step=0.05,
+                unit_of_measurement="s",
+                mode=selector.NumberSelectorMode.BOX,
+            )
+        ),
+    }
+)
+
 class TesmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for TESmart integration."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize flow."""
+        self._discovered_device: TesmartDiscoveredDevice | None = None
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(
+        cls, config_entry: config_entries.ConfigEntry
+    ) -> bool:
+        """Return `true` for devices; groups have no options."""
+        return CONF_MEMBERS not in config_entry.data
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> TesmartOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return TesmartOptionsFlowHandler()
+
     async def async_step_user(
         self,
-        user_input: TesmartConfigInput | None = None,
+        user_input: None = None,
     ) -> config_entries.FlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(
+            step_id="user", menu_options=["scan", "manual", "group"]
+        )
+
+    async def async_step_manual(
+        self,
+        user_input: TesmartConfigInput | None = None,
+    ) -> config_entries.FlowResult:
+        """Add a device by IP address or hostname."""
         errors: dict[str, str] = {}
         config_input: TesmartConfigInput = user_input or {}
 
@@ -85,7 +260,7 @@ class TesmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=self.add_suggested_values_to_schema(
                 CONFIG_SCHEMA,
                 suggested_values={
@@ -97,6 +272,191 @@ class TesmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors = errors,
         )
 
+    async def async_step_group(
+        self,
+        user_input: dict[str, str | list[str]] | None = None,
+    ) -> config_entries.FlowResult:
+        """Group devices that switch to the same source together."""
+        errors: dict[str, str] = {}
+        devices = {
+            entry.entry_id: entry.title
+            for entry in self._async_current_entries()
+            if CONF_MEMBERS not in entry.data
+        }
+
+        if user_input is not None:
+            if len(user_input[CONF_MEMBERS]) < 2:
+                errors[CONF_MEMBERS] = "too_few_members"
+            else:
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data=user_input,
+                )
+
+        return self.async_show_form(
+            step_id="group",
+            data_schema=self.add_suggested_values_to_schema(
+                vol.Schema(
+                    {
+                        vol.Required(
+                            CONF_NAME,
+                        ): selector.TextSelector(
+                            selector.TextSelectorConfig(
+                                type=selector.TextSelectorType.TEXT
+                            )
+                        ),
+                        vol.Required(
+                            CONF_MEMBERS,
+                        ): selector.SelectSelector(
+                            selector.SelectSelectorConfig(
+                                options=[
+                                    selector.SelectOptionDict(value=entry_id, label=title)
+                                    for entry_id, title in devices.items()
+                                ],
+                                multiple=True,
+                            )
+                        ),
+                    }
+                ),
+                suggested_values=user_input or {},
+            ),
+            errors = errors,
+        )
+
+    async def async_step_reconfigure(
+        self,
+        user_input: dict[str, str] | None = None,
+    ) -> config_entries.FlowResult:
+        """Change the address of a configured device."""
+        errors: dict[str, str] = {}
+        entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        if CONF_MEMBERS in entry.data:
+            return self.async_abort(reason="group_has_no_address")
+
+        if user_input is not None:
+            try:
+                await self._test_connection(
+                    name = entry.data[CONF_NAME],
+                    ip_address = user_input[CONF_IP_ADDRESS],
+                    port = user_input.get(CONF_PORT, None),
+                )
+            except TesmartApiClientCommunicationError as exception:
+                LOGGER.error(exception)
+                errors["base"] = "connection"
+            except TesmartApiClientError as exception:
+                LOGGER.exception(exception)
+                errors["base"] = "unknown"
+
+            if not errors:
+                ip_address = user_input[CONF_IP_ADDRESS]
+                port = user_input.get(CONF_PORT, None)
+                # The entry's update listener reconnects to the new address
+                self.hass.config_entries.async_update_entry(
+                    entry,
+                    data={
+                        CONF_NAME: entry.data[CONF_NAME],
+                        CONF_IP_ADDRESS: ip_address,
+                        CONF_PORT: port,
+                    },
+                    # Discovered devices are identified by their address
+                    unique_id=entry.unique_id and f"{ip_address}:{int(port or DEFAULT_PORT)}",
+                )
+                return self.async_abort(reason="reconfigure_successful")
+
+        return self.async_show_form(
+            step_id="reconfigure",
+            data_schema=self.add_suggested_values_to_schema(
+                RECONFIGURE_SCHEMA,
+                suggested_values=user_input or entry.data,
+            ),
+            errors = errors,
+        )
+
+    async def async_step_scan(
+        self,
+        user_input: dict[str, str] | None = None,
+    ) -> config_entries.FlowResult:
+        """Scan a network for devices, offering each one found for setup."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            port = int(user_input.get(CONF_PORT) or DEFAULT_PORT)
+            # Devices may only accept one connection, so leave configured ones alone
+            configured = {
+                entry.data.get(CONF_IP_ADDRESS) for entry in self._async_current_entries()
+            }
+            try:
+                hosts = scan_hosts(user_input[CONF_NETWORK], exclude = configured)
+            except ValueError as exception:
+                LOGGER.error(exception)
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                devices = await async_scan(hosts, port = port)
+                if devices:
+                    for device in devices:
+                        discovery_flow.async_create_flow(
+                            self.hass,
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                            data=device,
+                        )
+                    return self.async_abort(
+                        reason="discovery_started",
+                        description_placeholders={"count": str(len(devices))},
+                    )
+                errors["base"] = "no_devices_found"
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=self.add_suggested_values_to_schema(
+                SCAN_SCHEMA,
+                suggested_values=user_input or {},
+            ),
+            errors = errors,
+        )
+
+    async def async_step_integration_discovery(
+        self,
+        discovery_info: TesmartDiscoveredDevice,
+    ) -> config_entries.FlowResult:
+        """Handle a device found by a network scan."""
+        ip_address = discovery_info["ip_address"]
+        await self.async_set_unique_id(f"{ip_address}:{discovery_info['port']}")
+        self._abort_if_unique_id_configured()
+        self._async_abort_entries_match({CONF_IP_ADDRESS: ip_address})
+
+        self._discovered_device = discovery_info
+        self.context["title_placeholders"] = {CONF_IP_ADDRESS: ip_address}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self,
+        user_input: dict[str, str] | None = None,
+    ) -> config_entries.FlowResult:
+        """Confirm setup of a discovered device."""
+        device = self._discovered_device
+        if user_input is not None:
+            return self.async_create_entry(
+                title=user_input[CONF_NAME],
+                data={
+                    CONF_NAME: user_input[CONF_NAME],
+                    CONF_IP_ADDRESS: device["ip_address"],
+                    CONF_PORT: device["port"],
+                },
+            )
+
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            data_schema=self.add_suggested_values_to_schema(
+                DISCOVERY_CONFIRM_SCHEMA,
+                suggested_values={CONF_NAME: f"{NAME} {device['ip_address']}"},
+            ),
+            description_placeholders={
+                CONF_IP_ADDRESS: device["ip_address"],
+                CONF_PORT: str(device["port"]),
+            },
+        )
+
     async def _test_connection(self, name: str, ip_address: str, port: int | None) -> bool:
         """Validate device connection details."""
         client = TesmartApiClient(
@@ -104,11 +464,37 @@ class TesmartConfigFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             ip_address = ip_address,
             port = port
         )
-        return await self.hass.async_add_executor_job(
-            self._api_connect, client
-        )
+        try:
+            await client.async_refresh_state()
+            return client.is_connected
+        finally:
+            await client.async_close()
+
+
+class TesmartOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for TESmart integration."""
+
+    async def async_step_init(
+        self,
+        user_input: dict[str, float] | None = None,
+    ) -> config_entries.FlowResult:
+        """Manage polling, liveness probing, device deadlines and source names.
+
+        Changes are applied to the running device without reconnecting.
+        """
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            source_names = [name for name in user_input[CONF_SOURCE_NAMES] if name]
+            if len(set(source_names)) < len(source_names):
+                errors[CONF_SOURCE_NAMES] = "duplicate_source_names"
+            else:
+                return self.async_create_entry(data=user_input)
 
-    def _api_connect(self, client: TesmartApiClient) -> bool:
-        # Synchronous call; wrap in `hass.async_add_executor_job`
-        client.refresh_state()
-        return client.is_connected
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA,
+                suggested_values=user_input or self.config_entry.options,
+            ),
+            errors = errors,
+        )
@@ -0,0 +1,415 @@
+"""Persistent TCP connection to a TESmart device."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+import time
+from collections.abc import Callable, Sequence
+
+from .capture import CaptureDirection, TesmartCapture
+from .const import (
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_RECONNECT_BACKOFF_MAX,
+    DEFAULT_RECONNECT_BACKOFF_MIN,
+    DEFAULT_STATUS_TIMEOUT,
+    LOGGER,
+)
+from .protocol import (
+    FRAME_SIZE,
+    Command,
+    FrameDecoder,
+    encode_frame,
+)
+from .rtt import TesmartRttEstimator
+from .telemetry import TesmartTelemetry
+from .tracing import TesmartPhaseTimer
+
+FrameCallback = Callable[[int, int], None]
+# Decides whether a frame is a reply to the exchange in progress
+ReplyMatcher = Callable[[int, int], bool]
+ConnectionCallback = Callable[[bool], None]
+
+# Bytes requested per read; a burst of pushed frames is decoded in one pass
+READ_SIZE = 64 * FRAME_SIZE
+
+
+class TesmartConnection:
+    """Holds a device socket open, probes its liveness and reconnects in the background.
+
+    The connection only counts as connected once the device has answered a
+    liveness probe, so a device that accepts connections but does not respond
+    is never reported as connected.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        on_frame: FrameCallback,
+        on_connection_change: ConnectionCallback | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        command_timeout: float = DEFAULT_COMMAND_TIMEOUT,
+        status_timeout: float = DEFAULT_STATUS_TIMEOUT,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+        telemetry: TesmartTelemetry | None = None,
+        rtt: TesmartRttEstimator | None = None,
+    ) -> None:
+        """Initialize connection; liveness probe deadlines adapt to `rtt`."""
+        self._host = host
+        self._port = port
+        self._on_frame = on_frame
+        self._on_connection_change = on_connection_change
+        self._connect_timeout = connect_timeout
+        self._command_timeout = command_timeout
+        # Liveness probes are status queries
+        self._status_timeout = status_timeout
+        self._probe_interval = probe_interval
+        self._probe_rescheduled = asyncio.Event()
+        self._telemetry = telemetry or TesmartTelemetry()
+        self._rtt = rtt or TesmartRttEstimator()
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._connected = asyncio.Event()
+        # Set while no socket is open, to wake exchanges waiting on one
+        self._lost = asyncio.Event()
+        self._lost.set()
+        self._attempted = asyncio.Event()
+        self._lock = asyncio.Lock()
+        # `None` is queued when the connection is lost, failing the exchange
+        self._replies: asyncio.Queue[tuple[int, int] | None] | None = None
+        self._match: ReplyMatcher | None = None
+        # Loop time until which replies to an exchange that timed out may still
+        # arrive; the protocol has no request IDs to tell them apart by
+        self._late_until: float = 0.0
+        # Frames received before the connection is announced, so that listeners
+        # never see device state while it still counts as disconnected
+        self._held_frames: list[tuple[int, int]] = []
+        self._timer: TesmartPhaseTimer | None = None
+        self._last_activity: float = 0.0
+        self._last_error: Exception | None = None
+        self._run_task: asyncio.Task | None = None
+        # Once stopped, the connection is never reopened
+        self._closed = False
+        # Records every frame sent and received while set
+        self.capture: TesmartCapture | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Returns `true` if the socket is currently open; `false` otherwise."""
+        return self._connected.is_set()
+
+    def start(self) -> None:
+        """Start maintaining the connection in the background."""
+        if self._run_task is None and not self._closed:
+            self._run_task = asyncio.create_task(
+                self._async_run(), name=f"tesmart connection {self._host}:{self._port}"
+            )
+
+    async def async_stop(self) -> None:
+        """Close the socket and stop reconnecting, for good."""
+        self._closed = True
+        if self._run_task is not None:
+            self._run_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._run_task
+            self._run_task = None
+        self._disconnect()
+
+    def set_timeouts(
+        self, connect_timeout: float, command_timeout: float, status_timeout: float
+    ) -> None:
+        """Change deadlines, effective from the next operation."""
+        self._connect_timeout = connect_timeout
+        self._command_timeout = command_timeout
+        self._status_timeout = status_timeout
+
+    def set_probe_interval(self, probe_interval: float) -> None:
+        """Change the seconds of device silence after which its liveness is probed."""
+        self._probe_interval = probe_interval
+        self._probe_rescheduled.set()
+
+    async def async_send(
+        self, frame: bytes, expect_reply: bool = True, timeout: float | None = None
+    ) -> tuple[int, int] | None:
+        """Send a frame, returning the device reply (if any) as `(command, value)`."""
+        replies = await self.async_send_many((frame,), int(expect_reply), timeout=timeout)
+        return replies[0] if replies else None
+
+    async def async_send_many(
+        self,
+        frames: Sequence[bytes],
+        expected_replies: int = 0,
+        timer: TesmartPhaseTimer | None = None,
+        timeout: float | None = None,
+        sample_rtt: bool = False,
+        match: ReplyMatcher | None = None,
+        jitter: float = 0.0,
+    ) -> list[tuple[int, int]]:
+        """Pipeline frames in a single write, returning up to `expected_replies` replies.
+
+        Writing and receiving replies must finish within `timeout` seconds
+        (the command timeout by default); replies still missing by then are
+        not returned. If a `timer` is given, the connect, lock, send and
+        receive phases are timed on it. With `sample_rtt`, the time from the
+        write to the last reply is recorded as a round trip time sample.
+
+        Only frames accepted by `match`, if given, count as replies. Without
+        it, the write waits until replies to an earlier exchange that timed
+        out can no longer arrive, so they are not taken for its own. After
+        that, it waits a random share of up to `jitter` seconds, so retries
+        from many devices don't bunch up.
+        """
+        if self._closed:
+            raise ConnectionError("Connection closed")
+        self.start()
+        try:
+            if not self.connected:
+                # Wait out an in-flight connection attempt, but never a backoff delay
+                async with asyncio.timeout(self._connect_timeout):
+                    await self._attempted.wait()
+                if not self.connected:
+                    raise ConnectionError(f"Not connected: {self._last_error}")
+        finally:
+            if timer is not None:
+                timer.lap("connect")
+
+        return await self._async_exchange(
+            frames, expected_replies, timer, timeout, sample_rtt, match, jitter
+        )
+
+    async def _async_exchange(
+        self,
+        frames: Sequence[bytes],
+        expected_replies: int = 0,
+        timer: TesmartPhaseTimer | None = None,
+        timeout: float | None = None,
+        sample_rtt: bool = False,
+        match: ReplyMatcher | None = None,
+        jitter: float = 0.0,
+    ) -> list[tuple[int, int]]:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            wait_until = loop.time()
+            if expected_replies and match is None:
+                # Late replies land while no exchange is waiting for replies
+                wait_until = max(wait_until, self._late_until)
+            if jitter:
+                # Only once the late-reply window has passed, so it is never swallowed by it
+                wait_until += random.uniform(0, jitter)
+            if wait_until > loop.time():
+                # Losing the connection ends the wait early
+                with contextlib.suppress(TimeoutError):
+                    async with asyncio.timeout_at(wait_until):
+                        await self._lost.wait()
+            if timer is not None:
+                timer.lap("lock")
+            writer = self._writer
+            if writer is None:
+                raise ConnectionError("Connection lost")
+
+            timeout = timeout or self._command_timeout
+            deadline = loop.time() + timeout
+            replies: list[tuple[int, int]] = []
+            self._replies = asyncio.Queue() if expected_replies else None
+            self._match = match
+            self._timer = timer
+            try:
+                # Timed from here, so that connecting and waiting on the lock are not sampled
+                started = time.monotonic()
+                # Frames go out in a single write, without first being joined
+                writer.writelines(frames)
+                if self.capture is not None:
+                    for frame in frames:
+                        self.capture.record(CaptureDirection.SENT, frame)
+                async with asyncio.timeout_at(deadline):
+                    await writer.drain()
+                self._last_activity = time.monotonic()
+                if timer is not None:
+                    timer.lap("send")
+                if self._replies is not None:
+                    # Device does not always send a response
+                    with contextlib.suppress(TimeoutError):
+                        async with asyncio.timeout_at(deadline):
+                            while len(replies) < expected_replies:
+                                if (reply := await self._replies.get()) is None:
+                                    raise ConnectionError("Connection lost")
+                                replies.append(reply)
+                    if timer is not None:
+                        timer.lap("receive")
+                    if len(replies) < expected_replies:
+                        # Missing replies may only be late; allow them another deadline
+                        self._late_until = loop.time() + timeout
+                    elif sample_rtt:
+                        self._rtt.record(time.monotonic() - started)
+                return replies
+            except (TimeoutError, asyncio.CancelledError):
+                if expected_replies:
+                    self._late_until = loop.time() + timeout
+                if writer.transport.get_write_buffer_size():
+                    # Timed out or cancelled mid-write, so the stream can't be
+                    # trusted; drop the socket rather than wait for it to drain
+                    self._disconnect(abort=True)
+                raise
+            except OSError:
+                self._disconnect()
+                raise
+            finally:
+                self._replies = None
+                self._match = None
+                self._timer = None
+
+    async def _async_run(self) -> None:
+        backoff = DEFAULT_RECONNECT_BACKOFF_MIN
+        while True:
+            self._attempted.clear()
+            try:
+                async with asyncio.timeout(self._connect_timeout):
+                    self._reader, self._writer = await asyncio.open_connection(
+                        self._host, self._port
+                    )
+            except (TimeoutError, OSError) as exception:
+                self._last_error = exception
+                self._attempted.set()
+                if isinstance(exception, TimeoutError):
+                    self._telemetry.record_timeout()
+                elif isinstance(exception, ConnectionRefusedError):
+                    self._telemetry.record_refusal()
+                else:
+                    self._telemetry.record_error()
+                LOGGER.debug(
+                    "Connecting to %s:%s failed, retrying in %ss: %s",
+                    self._host, self._port, backoff, exception,
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, DEFAULT_RECONNECT_BACKOFF_MAX)
+                continue
+
+            LOGGER.debug("Connected to %s:%s", self._host, self._port)
+            self._lost.clear()
+            self._last_activity = time.monotonic()
+            self._telemetry.record_connect()
+
+            answered = asyncio.Event()
+            prober = asyncio.create_task(self._async_probe_liveness(answered))
+            try:
+                await self._async_read_frames(self._reader)
+            except OSError as exception:
+                self._last_error = exception
+                LOGGER.debug(
+                    "Connection to %s:%s lost: %s", self._host, self._port, exception
+                )
+            finally:
+                prober.cancel()
+                self._disconnect()
+                self._attempted.set()
+
+            if answered.is_set():
+                backoff = DEFAULT_RECONNECT_BACKOFF_MIN
+                self._notify_connection_change(False)
+            else:
+                # Accepted the connection but never answered; don't hammer it
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, DEFAULT_RECONNECT_BACKOFF_MAX)
+
+    async def _async_read_frames(self, reader: asyncio.StreamReader) -> None:
+        decoder = FrameDecoder()
+        while True:
+            # Replies can arrive split across, or coalesced into, reads
+            data = await reader.read(READ_SIZE)
+            if not data:
+                raise ConnectionResetError("Connection closed by device")
+            self._last_activity = time.monotonic()
+            parse_started = time.perf_counter()
+            if discarded := decoder.feed(data, self._dispatch_frame):
+                LOGGER.warning("Discarded %s malformed bytes from %s", discarded, self._host)
+            if self._timer is not None:
+                self._timer.parse += time.perf_counter() - parse_started
+
+    def _dispatch_frame(self, command: int, value: int) -> None:
+        if self.capture is not None:
+            self.capture.record(CaptureDirection.RECEIVED, encode_frame(command, value))
+        if self._replies is not None and (self._match is None or self._match(command, value)):
+            self._replies.put_nowait((command, value))
+        if self.connected:
+            self._on_frame(command, value)
+        else:
+            self._held_frames.append((command, value))
+
+    async def _async_probe_liveness(self, answered: asyncio.Event) -> None:
+        # The first probe runs right away, and announces the connection once
+        # answered. Later ones only run once the device has been silent for the
+        # probe interval, so a busy device is never probed.
+        probe_frame = encode_frame(Command.QUERY_ACTIVE_INPUT)
+        while True:
+            if answered.is_set():
+                idle = time.monotonic() - self._last_activity
+                if idle < self._probe_interval:
+                    with contextlib.suppress(TimeoutError):
+                        async with asyncio.timeout(self._probe_interval - idle):
+                            await self._probe_rescheduled.wait()
+                    self._probe_rescheduled.clear()
+                    continue
+            if not await self._async_probe(probe_frame):
+                LOGGER.debug("Liveness probe to %s:%s unanswered", self._host, self._port)
+                self._telemetry.record_timeout()
+                self._last_error = TimeoutError("Device did not answer liveness probe")
+                self._disconnect()
+                return
+            if not answered.is_set():
+                answered.set()
+                self._last_error = None
+                self._connected.set()
+                self._attempted.set()
+                self._notify_connection_change(True)
+                held_frames, self._held_frames = self._held_frames, []
+                for command, value in held_frames:
+                    self._on_frame(command, value)
+
+    async def _async_probe(self, probe_frame: bytes) -> bool:
+        # A status query is idempotent, so it is retried with jitter while
+        # unanswered, within the retry budget
+        for attempt in range(self._rtt.retries(self._status_timeout) + 1):
+            timeout = self._rtt.timeout(self._status_timeout)
+            try:
+                # Bypasses the client's queue, so that probes never wait on commands.
+                # Replies to retries may be late replies to earlier attempts
+                # arriving after all, so only first attempts are sampled.
+                replies = await self._async_exchange(
+                    (probe_frame,),
+                    expected_replies=1,
+                    timeout=timeout,
+                    sample_rtt=not attempt,
+                    jitter=timeout if attempt else 0.0,
+                )
+            except OSError:
+                return False
+            except TimeoutError:
+                replies = []
+            if replies:
+                return True
+            self._rtt.record_timeout()
+        return False
+
+    def _notify_connection_change(self, connected: bool) -> None:
+        if self._on_connection_change is not None:
+            self._on_connection_change(connected)
+
+    def _disconnect(self, abort: bool = False) -> None:
+        self._connected.clear()
+        self._held_frames.clear()
+        self._lost.set()
+        if self._replies is not None:
+            # Fail the exchange in progress now, rather than at its deadline
+            self._replies.put_nowait(None)
+        if self._writer is not None:
+            if abort:
+                # Discard unsent data instead of flushing it to a stuck device
+                self._writer.transport.abort()
+            else:
+                self._writer.close()
+        self._reader = None
+        self._writer = None
@@ -1,4 +1,5 @@
 """Constants for Kramer integration."""
+from datetime import timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
@@ -6,12 +7,96 @@ LOGGER: Logger = getLogger(__package__)
 NAME = "TESmart"
 DOMAIN = "tesmart"
 
+# Names of TesmartApiState fields, to which entities subscribe
 DATA_INPUT_COUNT = "input_count"
 DATA_OUTPUT_COUNT = "output_count"
 DATA_SOURCE_SELECTED = "source_selected"
 DATA_SOURCE_LIST = "source_list"
+DATA_ROUTES = "routes"
 DATA_STATE = "state"
+DATA_BUZZER_ENABLED = "buzzer_enabled"
+DATA_LED_TIMEOUT_SECONDS = "led_timeout_seconds"
+DATA_AUTO_INPUT_DETECTION = "auto_input_detection"
+
+STORAGE_KEY = DOMAIN
+STORAGE_VERSION = 1
+# Seconds to batch up state changes before writing the cache to disk
+STORAGE_SAVE_DELAY = 30
+
+SERVICE_APPLY_PROFILE = "apply_profile"
+SERVICE_GET_HEALTH = "get_health"
+SERVICE_SET_TRACING = "set_tracing"
+SERVICE_DUMP_TRACE = "dump_trace"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_SELECT_GROUP_SOURCE = "select_group_source"
+
+ATTR_AUTO_INPUT_DETECTION = "auto_input_detection"
+ATTR_BUZZER_ENABLED = "buzzer_enabled"
+ATTR_ENABLED = "enabled"
+ATTR_FORMAT = "format"
+ATTR_LED_TIMEOUT_SECONDS = "led_timeout_seconds"
+ATTR_SOURCE = "source"
+
+TRACE_FORMAT_JSON = "json"
+TRACE_FORMAT_CHROME = "chrome"
+# Spans kept per device while tracing; older spans are discarded
+TRACE_BUFFER_SIZE = 1000
+# Frames kept per device while capturing; later frames are dropped
+CAPTURE_MAX_RECORDS = 100_000
+
+CONF_NETWORK = "network"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_STATUS_TIMEOUT = "status_timeout"
+CONF_POLL_INTERVAL = "poll_interval"
+CONF_PROBE_INTERVAL = "probe_interval"
+CONF_SOURCE_NAMES = "source_names"
+# Entry IDs of the devices in a group entry
+CONF_MEMBERS = "members"
 
 ENTITY_KEY = "tesmart_media_switch"
 ENTITY_PLACEHOLDER_INPUTS_KEY = "input_count"
 ENTITY_PLACEHOLDER_OUTPUTS_KEY = "output_count"
+
+# Seconds to wait for a TCP connection to be established
+DEFAULT_CONNECT_TIMEOUT = 5.0
+# Seconds a command or status query may take, from writing its frames to
+# receiving its reply; devices do not always reply to commands
+DEFAULT_COMMAND_TIMEOUT = 0.25
+DEFAULT_STATUS_TIMEOUT = 0.25
+# Seconds the device may be silent before a liveness probe (a status query)
+# is sent; an unanswered probe marks the device unavailable right away
+DEFAULT_PROBE_INTERVAL = 10.0
+# Bounds, in seconds, of the exponential backoff between reconnect attempts
+DEFAULT_RECONNECT_BACKOFF_MIN = 1.0
+DEFAULT_RECONNECT_BACKOFF_MAX = 60.0
+# Bounds, in seconds, of deadlines learned from a device's round trip times
+ADAPTIVE_TIMEOUT_MIN = 0.05
+ADAPTIVE_TIMEOUT_MAX = 5.0
+# Seconds an unanswered status query may take across all its attempts, and the
+# most times it is retried; commands are never retried
+DEFAULT_READ_RETRY_BUDGET = 2.0
+DEFAULT_MAX_READ_RETRIES = 2
+# Consecutive failures after which a device's circuit breaker opens, and the
+# bounds, in seconds, of the exponential backoff between probes while open
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3
+DEFAULT_BREAKER_BACKOFF_MIN = 5.0
+DEFAULT_BREAKER_BACKOFF_MAX = 60.0
+# Maximum device operations in flight at once, across all devices
+DEFAULT_MAX_CONCURRENT_IO = 32
+
+# Discovery: hosts probed at once, seconds each probe may take, and the
+# largest network that may be scanned
+DEFAULT_SCAN_CONCURRENCY = 64
+DEFAULT_SCAN_TIMEOUT = 1.0
+MAX_SCAN_HOSTS = 1024
+
+# Adaptive polling: poll fast for a short window after a command or detected
+# change, then back off exponentially while the device is idle or failing
+POLL_INTERVAL_FAST = timedelta(seconds=5)
+POLL_FAST_WINDOW = timedelta(minutes=1)
+POLL_INTERVAL_MIN = timedelta(minutes=1)
+POLL_INTERVAL_MAX = timedelta(minutes=30)
+# Fraction by which each entry's intervals are skewed so entries don't poll in lockstep
+POLL_JITTER = 0.1
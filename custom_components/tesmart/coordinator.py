@@ -1,10 +1,12 @@
 """DataUpdateCoordinator for TESmart integration."""
 from __future__ import annotations
 
+import random
+import time
 from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
@@ -13,9 +15,56 @@ from homeassistant.helpers.update_coordinator import (
 from .api import (
     TesmartApiState,
     TesmartApiClient,
+    TesmartApiClientCommunicationError,
     TesmartApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .const import (
+    DOMAIN,
+    LOGGER,
+    POLL_FAST_WINDOW,
+    POLL_INTERVAL_FAST,
+    POLL_INTERVAL_MAX,
+    POLL_INTERVAL_MIN,
+    POLL_JITTER,
+)
+from .tracing import TesmartPhaseTimer
+
+
+class TesmartPollScheduler:
+    """Picks the next poll interval based on recent device activity."""
+
+    def __init__(self, seed: str, min_interval: timedelta = POLL_INTERVAL_MIN) -> None:
+        """Initialize."""
+        # Fixed per entry, so that entries set up together drift apart
+        self._jitter = 1 + random.Random(seed).uniform(-POLL_JITTER, POLL_JITTER)
+        self._fast_until = 0.0
+        self.set_min_interval(min_interval)
+
+    def set_min_interval(self, min_interval: timedelta) -> None:
+        """Change the idle interval, restarting the backoff from it."""
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, POLL_INTERVAL_MAX)
+        self._idle_interval = min_interval
+
+    def note_activity(self) -> None:
+        """Open a fast polling window after a command or state change."""
+        self._fast_until = time.monotonic() + POLL_FAST_WINDOW.total_seconds()
+        self._idle_interval = self._min_interval
+
+    def next_interval(self, changed: bool = False, failed: bool = False) -> timedelta:
+        """Interval until the next poll, given the outcome of the last one."""
+        if failed:
+            self._idle_interval = min(self._idle_interval * 2, self._max_interval)
+            return self._idle_interval * self._jitter
+
+        if changed:
+            self.note_activity()
+        if time.monotonic() < self._fast_until:
+            return POLL_INTERVAL_FAST * self._jitter
+
+        interval = self._idle_interval
+        self._idle_interval = min(interval * 2, self._max_interval)
+        return interval * self._jitter
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
@@ -28,24 +77,87 @@ class TesmartDataUpdateCoordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         client: TesmartApiClient,
+        poll_interval: timedelta = POLL_INTERVAL_MIN,
     ) -> None:
-        """Initialize."""
+        """Initialize; `poll_interval` is the interval while the device is idle."""
         self.client = client
         super().__init__(
             hass=hass,
             logger=LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=5),
+            # Source changes are pushed by the device, so polling is only a
+            # consistency check; the scheduler adapts it to device activity
+            update_interval=poll_interval,
+        )
+        self._scheduler = TesmartPollScheduler(
+            seed=self.config_entry.entry_id if self.config_entry else client.name,
+            min_interval=poll_interval,
+        )
+        self._unsub_client = client.add_update_listener(self._async_handle_push)
+        # State fields changed by the update being published to listeners
+        self.changed_fields: frozenset[str] = frozenset()
+        self._published: TesmartApiState | None = None
+
+    async def async_shutdown(self) -> None:
+        """Stop listening for pushed state, and cancel any scheduled refresh."""
+        self._unsub_client()
+        await super().async_shutdown()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update listeners, recording which state fields changed since the last update."""
+        self.changed_fields = (
+            self.data.changed_fields(self._published) if self.data else frozenset()
         )
+        self._published = self.data
+        super().async_update_listeners()
+
+    @callback
+    def async_set_poll_interval(self, poll_interval: timedelta) -> None:
+        """Change the idle poll interval, rescheduling the next poll."""
+        self._scheduler.set_min_interval(poll_interval)
+        self.update_interval = self._scheduler.next_interval()
+        self._schedule_refresh()
+
+    @callback
+    def async_note_command(self) -> None:
+        """Poll quickly for a short while after a user command."""
+        self._scheduler.note_activity()
+        self.update_interval = self._scheduler.next_interval()
+        self._schedule_refresh()
 
     async def _async_update_data(self) -> TesmartApiState:
         """Update device state."""
+        timer = TesmartPhaseTimer() if self.client.tracer.enabled else None
         try:
-            return await self.hass.async_add_executor_job(self._get_data)
+            await self.client.async_refresh_state()
         except TesmartApiClientError as exception:
+            self.update_interval = self._scheduler.next_interval(failed=True)
             raise UpdateFailed(exception) from exception
+        finally:
+            if timer is not None:
+                timer.lap("refresh")
+                self.client.tracer.record("coordinator_update", timer)
+
+        state = self.client.state
+        self.update_interval = self._scheduler.next_interval(
+            changed=self.data is not None and state != self.data
+        )
+        return state
 
-    # Synchronous; invoke via `hass.async_add_executor_job`
-    def _get_data(self) -> TesmartApiState:
-        self.client.refresh_state()
-        return self.client.state
+    @callback
+    def _async_handle_push(self) -> None:
+        """Publish state pushed by the device without polling."""
+        if self.client.is_available:
+            self._scheduler.note_activity()
+            self.update_interval = self._scheduler.next_interval()
+            self.async_set_updated_data(self.client.state)
+        else:
+            # Entities follow the connection and circuit breaker
+            self.async_set_update_error(
+                TesmartApiClientCommunicationError(
+                    f"Lost connection to device '{self.client.name}'"
+                    if not self.client.is_connected
+                    else f"Device '{self.client.name}' is not responding"
+                )
+            )
@@ -0,0 +1,49 @@
+"""Diagnostics support for TESmart media switches."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, CONF_UNIQUE_ID
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_MEMBERS, DOMAIN
+from .hub import TesmartHub
+
+# Discovered entries are identified by their address, and named after it by default
+TO_REDACT = {CONF_IP_ADDRESS, CONF_NAME, CONF_UNIQUE_ID, "title"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    hub: TesmartHub = hass.data[DOMAIN]
+    if CONF_MEMBERS in entry.data:
+        return {
+            "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+            "loaded_members": [
+                member for member in entry.data[CONF_MEMBERS] if member in hub.coordinators
+            ],
+        }
+    coordinator = hub.coordinators[entry.entry_id]
+    client = coordinator.client
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "connected": client.is_connected,
+        "breaker": {
+            "state": client.breaker.state,
+            "failures": client.breaker.failures,
+            "probe_in": client.breaker.probe_in,
+        },
+        "snapshot": client.snapshot,
+        "data": asdict(coordinator.data) if coordinator.data else None,
+        "update_interval": str(coordinator.update_interval),
+        "last_update_success": coordinator.last_update_success,
+        "telemetry": client.telemetry.as_dict(),
+        "rtt": client.rtt.as_dict(client.status_timeout),
+        # Unavailable devices are listed by name, so only their number is kept
+        "hub": {**hub.health, "unavailable": len(hub.health["unavailable"])},
+    }
@@ -0,0 +1,87 @@
+"""Network discovery of TESmart devices."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import ipaddress
+from collections.abc import Collection
+from typing import TypedDict
+
+from .const import (
+    DEFAULT_SCAN_CONCURRENCY,
+    DEFAULT_SCAN_TIMEOUT,
+    LOGGER,
+    MAX_SCAN_HOSTS,
+)
+from .protocol import (
+    DEFAULT_PORT,
+    FRAME_SIZE,
+    Command,
+    decode_frame,
+    encode_frame,
+)
+
+
+class TesmartDiscoveredDevice(TypedDict):
+    """Device that answered a discovery probe."""
+
+    ip_address: str
+    port: int
+    selected_source: str
+
+
+def scan_hosts(network: str, exclude: Collection[str] = ()) -> list[str]:
+    """Return the host addresses of a CIDR range, raising `ValueError` if invalid or too large."""
+    hosts = ipaddress.ip_network(network, strict=False)
+    if hosts.num_addresses > MAX_SCAN_HOSTS:
+        msg = f"Network {network} has more than {MAX_SCAN_HOSTS} addresses"
+        raise ValueError(msg)
+    # hosts() excludes network and broadcast addresses, except for /31 and /32
+    return [str(host) for host in hosts.hosts() if str(host) not in exclude]
+
+
+async def async_scan(
+    hosts: Collection[str],
+    port: int = DEFAULT_PORT,
+    concurrency: int = DEFAULT_SCAN_CONCURRENCY,
+    timeout: float = DEFAULT_SCAN_TIMEOUT,
+) -> list[TesmartDiscoveredDevice]:
+    """Probe hosts concurrently, returning those that speak the Hex protocol.
+
+    At most `concurrency` hosts are probed at once, and each probe, from
+    connecting to reading the reply, must finish within `timeout` seconds.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host: str) -> TesmartDiscoveredDevice | None:
+        async with semaphore:
+            return await _async_probe(host, port, timeout)
+
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    devices = [device for device in results if device is not None]
+    LOGGER.debug("Found %s of %s scanned hosts on port %s", len(devices), len(hosts), port)
+    return devices
+
+
+async def _async_probe(
+    host: str, port: int, timeout: float
+) -> TesmartDiscoveredDevice | None:
+    writer: asyncio.StreamWriter | None = None
+    try:
+        async with asyncio.timeout(timeout):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(encode_frame(Command.QUERY_ACTIVE_INPUT))
+            await writer.drain()
+            command, value = decode_frame(await reader.readexactly(FRAME_SIZE))
+    except (TimeoutError, OSError, asyncio.IncompleteReadError, ValueError):
+        # Not listening, not answering, or not speaking the Hex protocol
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+    if command != Command.CURRENT_ACTIVE_INPUT:
+        return None
+    return {"ip_address": host, "port": port, "selected_source": str(value + 1)}
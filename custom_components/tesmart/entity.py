@@ -1,6 +1,7 @@
 """Base entity class."""
 from __future__ import annotations
 
+from homeassistant.core import callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -11,9 +12,13 @@ from .coordinator import TesmartDataUpdateCoordinator
 class TesmartEntity(CoordinatorEntity):
     """Entity class."""
 
+    # State fields the entity renders, or `None` to write state on every update
+    _state_fields: frozenset[str] | None = None
+
     def __init__(self, coordinator: TesmartDataUpdateCoordinator) -> None:
         """Initialize."""
         super().__init__(coordinator)
+        self._published_available: bool | None = None
         self._attr_unique_id = coordinator.config_entry.entry_id
         input_count = coordinator.client.input_count
         output_count = coordinator.client.output_count
@@ -24,3 +29,16 @@ class TesmartEntity(CoordinatorEntity):
             model=model,
             name=coordinator.client.name,
         )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if availability or a rendered field changed."""
+        available = self.available
+        if (
+            self._state_fields is not None
+            and available == self._published_available
+            and not self._state_fields & self.coordinator.changed_fields
+        ):
+            return
+        self._published_available = available
+        super()._handle_coordinator_update()
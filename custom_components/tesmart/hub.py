@@ -0,0 +1,160 @@
+"""Shared I/O hub for all configured TESmart devices."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, TypedDict
+
+from .api import TesmartApiClient, TesmartApiClientError
+from .const import (
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_IO,
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_STATUS_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from .cache import TesmartStateCache
+    from .coordinator import TesmartDataUpdateCoordinator
+
+
+class TesmartHubHealth(TypedDict):
+    """Aggregate health of all configured devices."""
+
+    devices: int
+    connected: int
+    unavailable: list[str]
+    io_limit: int
+    io_in_flight: int
+    io_waiting: int
+
+
+class TesmartGroupSwitchResult(TypedDict):
+    """Outcome of switching a group of devices to the same source."""
+
+    # Milliseconds from dispatch until each device confirmed, keyed by device name
+    completed_ms: dict[str, float]
+    # Milliseconds between the first and last confirmation
+    spread_ms: float
+    # Error, or refusal, of each device that did not switch
+    failed: dict[str, str]
+
+
+class TesmartIoLimiter:
+    """Caps concurrent device I/O across all devices.
+
+    Each device runs at most one operation at a time, and waiters are served in
+    arrival order, so devices take turns fairly when the cap is reached.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize limiter."""
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self) -> None:
+        """Wait for an I/O slot."""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Release the I/O slot."""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class TesmartHub:
+    """Owns the clients of all configured devices, sharing one event loop."""
+
+    def __init__(
+        self,
+        cache: TesmartStateCache,
+        max_concurrent_io: int = DEFAULT_MAX_CONCURRENT_IO,
+    ) -> None:
+        """Initialize hub."""
+        self.cache = cache
+        self.io_limiter = TesmartIoLimiter(max_concurrent_io)
+        self.coordinators: dict[str, TesmartDataUpdateCoordinator] = {}
+
+    def create_client(
+        self,
+        name: str,
+        ip_address: str,
+        port: int | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        command_timeout: float = DEFAULT_COMMAND_TIMEOUT,
+        status_timeout: float = DEFAULT_STATUS_TIMEOUT,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+    ) -> TesmartApiClient:
+        """Create a client whose I/O is scheduled by this hub."""
+        return TesmartApiClient(
+            name = name,
+            ip_address = ip_address,
+            port = port,
+            io_limiter = self.io_limiter,
+            connect_timeout = connect_timeout,
+            command_timeout = command_timeout,
+            status_timeout = status_timeout,
+            probe_interval = probe_interval,
+        )
+
+    async def async_select_group_source(
+        self,
+        coordinators: Sequence[TesmartDataUpdateCoordinator],
+        source: int | str,
+    ) -> TesmartGroupSwitchResult:
+        """Switch every device to the same source at once.
+
+        Commands are dispatched together over the devices' open connections, so
+        devices change within one round trip of each other; the result reports
+        when each one confirmed.
+        """
+        started = time.perf_counter()
+
+        async def select_source(coordinator: TesmartDataUpdateCoordinator) -> float:
+            if not await coordinator.client.async_select_source(source):
+                raise TesmartApiClientError(f"Device did not switch to source '{source}'")
+            return (time.perf_counter() - started) * 1000
+
+        results = await asyncio.gather(
+            *(select_source(coordinator) for coordinator in coordinators),
+            return_exceptions=True,
+        )
+
+        completed_ms: dict[str, float] = {}
+        failed: dict[str, str] = {}
+        for coordinator, result in zip(coordinators, results, strict=True):
+            # A cancelled device is a failure too, and raises no Exception
+            if isinstance(result, BaseException):
+                failed[coordinator.client.name] = str(result) or type(result).__name__
+                continue
+            completed_ms[coordinator.client.name] = result
+            coordinator.async_note_command()
+        return {
+            "completed_ms": completed_ms,
+            "spread_ms": max(completed_ms.values()) - min(completed_ms.values())
+            if completed_ms
+            else 0.0,
+            "failed": failed,
+        }
+
+    @property
+    def health(self) -> TesmartHubHealth:
+        """Aggregate health of all configured devices."""
+        clients = [coordinator.client for coordinator in self.coordinators.values()]
+        return {
+            "devices": len(clients),
+            "connected": sum(client.is_connected for client in clients),
+            "unavailable": [client.name for client in clients if not client.is_available],
+            "io_limit": self.io_limiter.limit,
+            "io_in_flight": self.io_limiter.in_flight,
+            "io_waiting": self.io_limiter.waiting,
+        }
@@ -1,23 +1,40 @@
 """Media Player platform entity implementation."""
+from typing import Any
+
 from homeassistant.components.media_player import (
+    DOMAIN as MEDIA_PLAYER_DOMAIN,
     MediaPlayerDeviceClass,
     MediaPlayerEntityDescription,
     MediaPlayerEntityFeature,
     MediaPlayerEntity,
     MediaPlayerState,
 )
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_NAME,
+    STATE_ON,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import Event, EventStateChangedData, State, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
 
 from .const import (
+    CONF_MEMBERS,
     DATA_INPUT_COUNT,
     DATA_OUTPUT_COUNT,
+    DATA_ROUTES,
     DATA_SOURCE_LIST,
-    DATA_SOURCE_SELECTED,
     DATA_STATE,
     DOMAIN,
 )
 from .api import TesmartApiClient
 from .coordinator import TesmartDataUpdateCoordinator
 from .entity import TesmartEntity
+from .hub import TesmartGroupSwitchResult, TesmartHub
 
 ENTITY_DESCRIPTIONS = (
     MediaPlayerEntityDescription(
@@ -29,13 +46,20 @@ ENTITY_DESCRIPTIONS = (
 
 async def async_setup_entry(hass, entry, async_add_devices):
     """Set up devices based on config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    if CONF_MEMBERS in entry.data:
+        async_add_devices([TesmartGroupMediaPlayer(entry)])
+        return
+
+    coordinator = hass.data[DOMAIN].coordinators[entry.entry_id]
+    # One media player per output, each routing a source to its output
     async_add_devices(
         TesmartMediaPlayer(
             coordinator=coordinator,
-            entity_description=entity_description
+            entity_description=entity_description,
+            output=output,
         )
         for entity_description in ENTITY_DESCRIPTIONS
+        for output in range(1, coordinator.client.output_count + 1)
     )
 
 class TesmartMediaPlayer(TesmartEntity, MediaPlayerEntity):
@@ -45,53 +69,169 @@ class TesmartMediaPlayer(TesmartEntity, MediaPlayerEntity):
         MediaPlayerEntityFeature.SELECT_SOURCE
     )
     _attr_name = None
+    _state_fields = frozenset(
+        {DATA_INPUT_COUNT, DATA_OUTPUT_COUNT, DATA_ROUTES, DATA_SOURCE_LIST, DATA_STATE}
+    )
 
     def __init__(
         self,
         coordinator: TesmartDataUpdateCoordinator,
         entity_description: MediaPlayerEntityDescription,
+        output: int = 1,
     ) -> None:
         """Initialize the entity."""
         super().__init__(coordinator)
         self.entity_description = entity_description
+        self._output = output
+        if output > 1:
+            # The first output keeps the device's own name and ID
+            self._attr_name = f"Output {output}"
+            self._attr_unique_id = f"{coordinator.config_entry.entry_id}_output_{output}"
 
     @property
     def input_count(self) -> int:
         """Number of inputs supported by the media player."""
-        return self._prop(DATA_INPUT_COUNT)
+        return self.coordinator.data.input_count
 
     @property
     def output_count(self) -> int:
         """Number of outputs supported by the media player."""
-        return self._prop(DATA_OUTPUT_COUNT)
+        return self.coordinator.data.output_count
 
     @property
     def source(self) -> str | None:
-        """Name of the current input source."""
-        return self._prop(DATA_SOURCE_SELECTED)
+        """Name of the input source routed to this output."""
+        data = self.coordinator.data
+        if self._output > len(data.routes):
+            return None
+        # Routes are input numbers; the source list holds their names
+        source_number = int(data.routes[self._output - 1])
+        if 1 <= source_number <= len(data.source_list):
+            return data.source_list[source_number - 1]
+        return None
 
     @property
     def source_list(self) -> list[str] | None:
         """List of available input sources."""
-        return self._prop(DATA_SOURCE_LIST)
+        # Needs to be list[str] to avoid issues with HA frontend
+        return list(self.coordinator.data.source_list)
 
     @property
     def state(self) -> MediaPlayerState | None:
         """State of the player."""
-        return self._prop(DATA_STATE)
-
-    def select_source(self, source: str) -> None:
-        """Select input source."""
-        self._client.select_source(source)
+        return self.coordinator.data.state
 
     async def async_select_source(self, source: str) -> None:
         """Select input source."""
-        await self.hass.async_add_executor_job(self.select_source, source)
-        await self.coordinator.async_request_refresh()
+        # State is published optimistically and verified by the client, so no
+        # follow-up refresh is needed
+        await self._client.async_set_routes({self._output: source})
+        self.coordinator.async_note_command()
 
     @property
     def _client(self) -> TesmartApiClient:
         return self.coordinator.client
 
-    def _prop(self, key: str):
-        return self.coordinator.data.get(key)
+
+class TesmartGroupMediaPlayer(MediaPlayerEntity):
+    """Switches a group of TESmart media switches to the same source together."""
+
+    _attr_should_poll = False
+    _attr_supported_features = (
+        MediaPlayerEntityFeature.SELECT_SOURCE
+    )
+    _attr_device_class = MediaPlayerDeviceClass.RECEIVER
+
+    def __init__(self, entry: ConfigEntry) -> None:
+        """Initialize the entity."""
+        self._members: list[str] = entry.data[CONF_MEMBERS]
+        self._attr_name = entry.data[CONF_NAME]
+        self._attr_unique_id = entry.entry_id
+        self._member_entity_ids: list[str] = []
+        self._last_switch: TesmartGroupSwitchResult | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the media players of the group members."""
+        registry = er.async_get(self.hass)
+        # A device's own media player shares the unique ID of its entry
+        self._member_entity_ids = [
+            entity_id
+            for member in self._members
+            if (
+                entity_id := registry.async_get_entity_id(
+                    MEDIA_PLAYER_DOMAIN, DOMAIN, member
+                )
+            )
+        ]
+        self.async_on_remove(
+            async_track_state_change_event(
+                self.hass, self._member_entity_ids, self._handle_member_update
+            )
+        )
+
+    @callback
+    def _handle_member_update(self, event: Event[EventStateChangedData]) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def available(self) -> bool:
+        """Return `true` if any member is available."""
+        return any(self._member_states())
+
+    @property
+    def state(self) -> MediaPlayerState | None:
+        """On if any member is on."""
+        if any(state.state == STATE_ON for state in self._member_states()):
+            return MediaPlayerState.ON
+        return MediaPlayerState.OFF
+
+    @property
+    def source(self) -> str | None:
+        """Source selected on every member, or `None` if they differ."""
+        sources = {state.attributes.get("source") for state in self._member_states()}
+        return sources.pop() if len(sources) == 1 else None
+
+    @property
+    def source_list(self) -> list[str] | None:
+        """Sources available on every member."""
+        source_lists = [
+            state.attributes.get("source_list") or [] for state in self._member_states()
+        ]
+        if not source_lists:
+            return None
+        return [
+            source
+            for source in source_lists[0]
+            if all(source in source_list for source_list in source_lists[1:])
+        ]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Members, and how far apart they switched on the last source change."""
+        attributes: dict[str, Any] = {ATTR_ENTITY_ID: self._member_entity_ids}
+        if self._last_switch is not None:
+            attributes["last_switch_spread_ms"] = round(self._last_switch["spread_ms"], 1)
+        return attributes
+
+    async def async_select_source(self, source: str) -> None:
+        """Switch every member to the source at once."""
+        hub: TesmartHub = self.hass.data[DOMAIN]
+        coordinators = [
+            hub.coordinators[member] for member in self._members if member in hub.coordinators
+        ]
+        self._last_switch = await hub.async_select_group_source(coordinators, source)
+        self.async_write_ha_state()
+        if failed := self._last_switch["failed"]:
+            raise HomeAssistantError(
+                "Failed switching "
+                + "; ".join(f"{name}: {error}" for name, error in failed.items())
+            )
+
+    def _member_states(self) -> list[State]:
+        # Only available members count towards the group's state
+        return [
+            state
+            for entity_id in self._member_entity_ids
+            if (state := self.hass.states.get(entity_id)) is not None
+            and state.state not in (STATE_UNAVAILABLE, STATE_UNKNOWN)
+        ]
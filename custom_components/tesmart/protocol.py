@@ -0,0 +1,127 @@
+"""TESmart Hex protocol frames.
+
+See https://support.tesmart.com/hc/en-us/article_attachments/27716605047961 for
+command documentation.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from enum import IntEnum, unique
+from functools import cache
+
+DEFAULT_PORT = 5000
+
+# Hex uses fixed-size, 6-byte frames: AA BB 03 <command> <value> EE
+FRAME_SIZE = 6
+FRAME_HEADER = b"\xaa\xbb\x03"
+FRAME_FOOTER = 0xEE
+
+# Only 8 bits available for data transport
+VALUE_MAX = 0xFF
+
+MAX_SUPPORTED_INPUTS = 16
+
+
+@unique
+class Command(IntEnum):
+    """Enumerates the supported Hex commands."""
+
+    SWITCH_VIDEO = 0x01
+    MUTE_BUZZER = 0x02
+    LED_TIMEOUT_SECONDS = 0x03
+    QUERY_ACTIVE_INPUT = 0x10
+    CURRENT_ACTIVE_INPUT = 0x11
+    ENABLE_INPUT_DETECTION = 0x81
+
+
+@cache
+def encode_frame(command: Command, value: int = 0) -> bytes:
+    """Build the frame for the given command and data value.
+
+    There are few distinct frames, so each is built once and then shared.
+    """
+    if not 0 <= value <= VALUE_MAX:
+        raise ValueError(
+            f"Valid values are between 0 and {VALUE_MAX}, inclusive. Received: {value}"
+        )
+    return FRAME_HEADER + bytes((command, value, FRAME_FOOTER))
+
+
+def decode_frame(data: bytes) -> tuple[int, int]:
+    """Parse a frame into its `(command, value)` pair."""
+    if (
+        len(data) != FRAME_SIZE
+        or data[:3] != FRAME_HEADER
+        or data[5] != FRAME_FOOTER
+    ):
+        raise ValueError(f"Malformed frame: {data.hex(' ')}")
+    return data[3], data[4]
+
+
+def is_frame(data: bytes | bytearray, offset: int = 0) -> bool:
+    """Return `true` if a well-formed frame starts at `offset` of `data`."""
+    return (
+        data.startswith(FRAME_HEADER, offset)
+        and len(data) - offset >= FRAME_SIZE
+        and data[offset + 5] == FRAME_FOOTER
+    )
+
+
+class FrameDecoder:
+    """Splits a byte stream into frames, however reads divide it.
+
+    Frames are parsed in place, without copying; only a frame split across
+    reads is copied, into a preallocated buffer, until its remainder arrives.
+    """
+
+    __slots__ = ("_pending", "_pending_view", "_pending_size")
+
+    def __init__(self) -> None:
+        """Initialize decoder."""
+        self._pending = bytearray(FRAME_SIZE)
+        self._pending_view = memoryview(self._pending)
+        self._pending_size = 0
+
+    def feed(self, data: bytes, on_frame: Callable[[int, int], None]) -> int:
+        """Decode every complete frame in `data`, calling `on_frame(command, value)`.
+
+        Trailing bytes of an incomplete frame are kept for the next call.
+        Returns the number of bytes discarded while resynchronizing on a frame
+        header.
+        """
+        position = 0
+        if self._pending_size:
+            position = min(FRAME_SIZE - self._pending_size, len(data))
+            self._pending_view[self._pending_size:self._pending_size + position] = (
+                memoryview(data)[:position]
+            )
+            self._pending_size += position
+            if self._pending_size < FRAME_SIZE:
+                return 0
+            self._pending_size = 0
+            if not is_frame(self._pending):
+                # Rare; rescan everything after the false header
+                return 1 + self.feed(bytes(self._pending_view[1:]) + data[position:], on_frame)
+            on_frame(self._pending[3], self._pending[4])
+
+        discarded = 0
+        end = len(data)
+        while position < end:
+            if end - position < FRAME_SIZE:
+                if data.startswith(FRAME_HEADER[:end - position], position):
+                    # Possibly the start of a frame; wait for the rest
+                    self._pending_size = end - position
+                    self._pending_view[:self._pending_size] = memoryview(data)[position:]
+                    break
+            elif is_frame(data, position):
+                on_frame(data[position + 3], data[position + 4])
+                position += FRAME_SIZE
+                continue
+
+            # Skip ahead to the next possible frame header
+            next_position = data.find(FRAME_HEADER[0], position + 1)
+            if next_position < 0:
+                next_position = end
+            discarded += next_position - position
+            position = next_position
+        return discarded
@@ -0,0 +1,93 @@
+"""Per-device round trip time estimation, for adaptive deadlines."""
+from __future__ import annotations
+
+from typing import Any
+
+from .const import (
+    ADAPTIVE_TIMEOUT_MAX,
+    ADAPTIVE_TIMEOUT_MIN,
+    DEFAULT_MAX_READ_RETRIES,
+    DEFAULT_READ_RETRY_BUDGET,
+)
+
+# Smoothing gains and variance multiplier, as in TCP (RFC 6298)
+RTT_ALPHA = 0.125
+RTT_BETA = 0.25
+RTT_K = 4
+# Largest factor by which consecutive timeouts stretch the deadline
+RTT_MAX_BACKOFF = 64
+
+
+class TesmartRttEstimator:
+    """Learns a device's round trip time, TCP style, to size its deadlines.
+
+    Until the first sample, deadlines fall back to the configured timeouts.
+    Afterwards, a deadline is the smoothed round trip time plus four times its
+    variation, doubled after each timeout until the device answers again.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float = ADAPTIVE_TIMEOUT_MIN,
+        max_timeout: float = ADAPTIVE_TIMEOUT_MAX,
+        retry_budget: float = DEFAULT_READ_RETRY_BUDGET,
+        max_retries: int = DEFAULT_MAX_READ_RETRIES,
+    ) -> None:
+        """Initialize estimator, without samples."""
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.retry_budget = retry_budget
+        self.max_retries = max_retries
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self._backoff = 1
+
+    def record(self, rtt: float) -> None:
+        """Add a round trip time sample, in seconds."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - RTT_BETA) * self.rttvar + RTT_BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - RTT_ALPHA) * self.srtt + RTT_ALPHA * rtt
+        self._backoff = 1
+
+    def record_timeout(self) -> None:
+        """Back off after a deadline passed without a reply."""
+        self._backoff = min(self._backoff * 2, RTT_MAX_BACKOFF)
+
+    def timeout(self, initial: float) -> float:
+        """Return the deadline for a reply, in seconds; `initial` applies until the first sample."""
+        if self.srtt is None:
+            return min(initial * self._backoff, max(initial, self.max_timeout))
+        timeout = (self.srtt + RTT_K * self.rttvar) * self._backoff
+        return min(max(timeout, self.min_timeout), self.max_timeout)
+
+    def retries(self, initial: float) -> int:
+        """Return how many times an unanswered read may be retried.
+
+        Every attempt must fit in the retry budget, even in the worst case:
+        each miss doubles the deadline, and each retry first waits out the
+        missed attempt's deadline for late replies, then a jittered delay of
+        up to its own deadline. Slow devices get fewer retries than fast ones.
+        """
+        timeout = self.timeout(initial)
+        elapsed = timeout
+        retries = 0
+        while retries < self.max_retries:
+            retry_timeout = min(timeout * 2, max(timeout, self.max_timeout))
+            elapsed += timeout + 2 * retry_timeout
+            if elapsed > self.retry_budget:
+                break
+            retries += 1
+            timeout = retry_timeout
+        return retries
+
+    def as_dict(self, initial: float) -> dict[str, Any]:
+        """Estimates serialized to a dictionary, in milliseconds."""
+        return {
+            "srtt_ms": self.srtt * 1000 if self.srtt is not None else None,
+            "rttvar_ms": self.rttvar * 1000,
+            "timeout_ms": self.timeout(initial) * 1000,
+            "read_retries": self.retries(initial),
+        }
@@ -5,25 +5,32 @@ from homeassistant.const import EntityCategory
 
 from .api import TesmartApiClient
 from .const import (
+    DATA_LED_TIMEOUT_SECONDS,
     DOMAIN,
 )
 from .coordinator import TesmartDataUpdateCoordinator
 from .entity import TesmartEntity
 
+LED_TIMEOUT_OPTIONS = {
+    "Off": 0,
+    "10s": 10,
+    "30s": 30,
+}
+
 SELECTORS = (
     SelectEntityDescription(
         has_entity_name=True,
         key="led_timeout",
         name="LED Timeout",
         icon="mdi:led-on",
-        options=["Off", "10s", "30s"],
+        options=list(LED_TIMEOUT_OPTIONS),
     ),
 )
 
 
 async def async_setup_entry(hass, entry, async_add_devices):
     """Set up devices based on config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator = hass.data[DOMAIN].coordinators[entry.entry_id]
     async_add_devices(
         TesmartSelectEntity(
             coordinator=coordinator, entity_description=entity_description
@@ -35,6 +42,8 @@ async def async_setup_entry(hass, entry, async_add_devices):
 class TesmartSelectEntity(TesmartEntity, SelectEntity):
     """Representation of a TESmart media switch configuration button."""
 
+    _state_fields = frozenset({DATA_LED_TIMEOUT_SECONDS})
+
     def __init__(
         self,
         coordinator: TesmartDataUpdateCoordinator,
@@ -48,24 +57,20 @@ class TesmartSelectEntity(TesmartEntity, SelectEntity):
         self._attr_unique_id = (
             f"{coordinator.config_entry.entry_id}_{entity_description.key}"
         )
-        self._attr_current_option = "Unknown"
 
-    def select_option(self, option: str) -> None:
-        """Handle selection change for a TesmartSelectEntity."""
-        led_timeout = 0
-        match option:
-            case "Off":
-                led_timeout = 0
-            case "10s":
-                led_timeout = 10
-            case "30s":
-                led_timeout = 30
-        self._client.set_led_timeout_seconds(led_timeout)
-        self._attr_current_option = option
+    @property
+    def current_option(self) -> str | None:
+        """Return the selected LED timeout, if known."""
+        led_timeout = self.coordinator.data.led_timeout_seconds
+        for option, seconds in LED_TIMEOUT_OPTIONS.items():
+            if seconds == led_timeout:
+                return option
+        return None
 
     async def async_select_option(self, option: str) -> None:
         """Handle async selection change for a TesmartSelectEntity."""
-        await self.hass.async_add_executor_job(self.select_option, option)
+        await self._client.async_set_led_timeout_seconds(LED_TIMEOUT_OPTIONS[option])
+        self.coordinator.async_note_command()
 
     @property
     def _client(self) -> TesmartApiClient:
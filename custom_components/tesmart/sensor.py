@@ -0,0 +1,123 @@
+"""Sensor platform entity implementation."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory, UnitOfTime
+
+from .const import (
+    DOMAIN,
+)
+from .coordinator import TesmartDataUpdateCoordinator
+from .entity import TesmartEntity
+from .telemetry import TesmartTelemetry
+
+
+@dataclass(frozen=True, kw_only=True)
+class TesmartSensorEntityDescription(SensorEntityDescription):
+    """Describes a TESmart telemetry sensor."""
+
+    value_fn: Callable[[TesmartTelemetry], float | int | datetime | None]
+
+
+SENSORS = (
+    TesmartSensorEntityDescription(
+        has_entity_name=True,
+        key="round_trip_time",
+        name="Round Trip Time",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda telemetry: telemetry.recent_rtt_ms,
+    ),
+    TesmartSensorEntityDescription(
+        has_entity_name=True,
+        key="timeouts",
+        name="Timeouts",
+        icon="mdi:timer-alert-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda telemetry: telemetry.timeouts,
+    ),
+    TesmartSensorEntityDescription(
+        has_entity_name=True,
+        key="connection_refusals",
+        name="Connection Refusals",
+        icon="mdi:lan-disconnect",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda telemetry: telemetry.refusals,
+    ),
+    TesmartSensorEntityDescription(
+        has_entity_name=True,
+        key="communication_errors",
+        name="Communication Errors",
+        icon="mdi:alert-circle-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda telemetry: telemetry.errors,
+    ),
+    TesmartSensorEntityDescription(
+        has_entity_name=True,
+        key="reconnects",
+        name="Reconnects",
+        icon="mdi:lan-pending",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda telemetry: telemetry.reconnects,
+    ),
+    TesmartSensorEntityDescription(
+        has_entity_name=True,
+        key="last_success",
+        name="Last Success",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda telemetry: telemetry.last_success,
+    ),
+)
+
+
+async def async_setup_entry(hass, entry, async_add_devices):
+    """Set up devices based on config entry."""
+    coordinator = hass.data[DOMAIN].coordinators[entry.entry_id]
+    async_add_devices(
+        TesmartSensorEntity(
+            coordinator=coordinator, entity_description=entity_description
+        )
+        for entity_description in SENSORS
+    )
+
+
+class TesmartSensorEntity(TesmartEntity, SensorEntity):
+    """Representation of a TESmart media switch telemetry sensor."""
+
+    entity_description: TesmartSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: TesmartDataUpdateCoordinator,
+        entity_description: TesmartSensorEntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+        self.entity_category = EntityCategory.DIAGNOSTIC
+        self.name = entity_description.name
+        self._attr_unique_id = (
+            f"{coordinator.config_entry.entry_id}_{entity_description.key}"
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return `true`; telemetry matters most while the device is failing."""
+        return True
+
+    @property
+    def native_value(self) -> float | int | datetime | None:
+        """Return the current telemetry value."""
+        return self.entity_description.value_fn(self.coordinator.client.telemetry)
@@ -0,0 +1,254 @@
+"""Services for TESmart integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import voluptuous as vol
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import slugify
+
+from .api import TesmartProfile
+from .capture import CAPTURE_FILE_SUFFIX
+from .const import (
+    ATTR_AUTO_INPUT_DETECTION,
+    ATTR_BUZZER_ENABLED,
+    ATTR_ENABLED,
+    ATTR_FORMAT,
+    ATTR_LED_TIMEOUT_SECONDS,
+    ATTR_SOURCE,
+    DOMAIN,
+    SERVICE_APPLY_PROFILE,
+    SERVICE_DUMP_TRACE,
+    SERVICE_GET_HEALTH,
+    SERVICE_SELECT_GROUP_SOURCE,
+    SERVICE_SET_TRACING,
+    SERVICE_START_CAPTURE,
+    SERVICE_STOP_CAPTURE,
+    TRACE_FORMAT_CHROME,
+    TRACE_FORMAT_JSON,
+)
+from .coordinator import TesmartDataUpdateCoordinator
+from .hub import TesmartHub
+from .tracing import chrome_trace
+
+APPLY_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_SOURCE): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_BUZZER_ENABLED): cv.boolean,
+        vol.Optional(ATTR_LED_TIMEOUT_SECONDS): vol.All(
+            vol.Coerce(int), vol.In([0, 10, 30])
+        ),
+        vol.Optional(ATTR_AUTO_INPUT_DETECTION): cv.boolean,
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+SET_TRACING_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_ENABLED): cv.boolean,
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+DUMP_TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_FORMAT, default=TRACE_FORMAT_JSON): vol.In(
+            [TRACE_FORMAT_JSON, TRACE_FORMAT_CHROME]
+        ),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+SELECT_GROUP_SOURCE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(ATTR_SOURCE): cv.string,
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register integration-wide services."""
+
+    async def async_apply_profile(call: ServiceCall) -> ServiceResponse:
+        """Apply a configuration and source to every targeted device."""
+        profile: TesmartProfile = {
+            key: call.data[key]
+            for key in (
+                ATTR_SOURCE,
+                ATTR_BUZZER_ENABLED,
+                ATTR_LED_TIMEOUT_SECONDS,
+                ATTR_AUTO_INPUT_DETECTION,
+            )
+            if key in call.data
+        }
+        coordinators = _coordinators_for_devices(hass, call.data[ATTR_DEVICE_ID])
+        # Devices are provisioned concurrently; each gets one pipelined write
+        results = await asyncio.gather(
+            *(
+                coordinator.client.async_apply_profile(profile)
+                for coordinator in coordinators
+            ),
+            return_exceptions=True,
+        )
+
+        frames_sent: dict[str, int] = {}
+        failed: list[str] = []
+        for coordinator, result in zip(coordinators, results, strict=True):
+            # A cancelled device is a failure too, and raises no Exception
+            if isinstance(result, BaseException):
+                failed.append(f"{coordinator.client.name}: {result or type(result).__name__}")
+                continue
+            frames_sent[coordinator.client.name] = result
+            coordinator.async_note_command()
+        if failed:
+            raise HomeAssistantError(f"Failed applying profile to {'; '.join(failed)}")
+        return {"frames_sent": frames_sent}
+
+    async def async_select_group_source(call: ServiceCall) -> ServiceResponse:
+        """Switch every targeted device to the same source at once."""
+        hub: TesmartHub = hass.data[DOMAIN]
+        result = await hub.async_select_group_source(
+            _coordinators_for_devices(hass, call.data[ATTR_DEVICE_ID]),
+            call.data[ATTR_SOURCE],
+        )
+        if result["failed"]:
+            failed = "; ".join(f"{name}: {error}" for name, error in result["failed"].items())
+            raise HomeAssistantError(f"Failed switching {failed}")
+        return dict(result)
+
+    async def async_get_health(call: ServiceCall) -> ServiceResponse:
+        """Report aggregate health of all configured devices."""
+        hub: TesmartHub = hass.data[DOMAIN]
+        return dict(hub.health)
+
+    async def async_set_tracing(call: ServiceCall) -> None:
+        """Start or stop tracing I/O of every targeted device."""
+        for coordinator in _coordinators_for_devices(hass, call.data[ATTR_DEVICE_ID]):
+            coordinator.client.tracer.set_enabled(call.data[ATTR_ENABLED])
+
+    async def async_dump_trace(call: ServiceCall) -> ServiceResponse:
+        """Return the spans recorded for every targeted device."""
+        tracers = {
+            coordinator.client.name: coordinator.client.tracer
+            for coordinator in _coordinators_for_devices(hass, call.data[ATTR_DEVICE_ID])
+        }
+        if call.data[ATTR_FORMAT] == TRACE_FORMAT_CHROME:
+            return chrome_trace(tracers)
+        return {"spans": {name: tracer.as_json() for name, tracer in tracers.items()}}
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        """Start capturing the frames exchanged with every targeted device."""
+        for coordinator in _coordinators_for_devices(hass, call.data[ATTR_DEVICE_ID]):
+            coordinator.client.start_capture()
+
+    async def async_stop_capture(call: ServiceCall) -> ServiceResponse:
+        """Stop capturing, writing each device's capture to a file."""
+        directory = Path(hass.config.path(DOMAIN, "captures"))
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        captures: dict[str, bytes] = {}
+        for coordinator in _coordinators_for_devices(hass, call.data[ATTR_DEVICE_ID]):
+            if (capture := coordinator.client.stop_capture()) is not None:
+                name = f"{slugify(coordinator.client.name)}-{stamp}{CAPTURE_FILE_SUFFIX}"
+                captures[str(directory / name)] = capture.to_bytes()
+        await hass.async_add_executor_job(_write_captures, directory, captures)
+        return {"files": list(captures)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_PROFILE,
+        async_apply_profile,
+        schema=APPLY_PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SELECT_GROUP_SOURCE,
+        async_select_group_source,
+        schema=SELECT_GROUP_SOURCE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HEALTH,
+        async_get_health,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_TRACING,
+        async_set_tracing,
+        schema=SET_TRACING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DUMP_TRACE,
+        async_dump_trace,
+        schema=DUMP_TRACE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        async_start_capture,
+        schema=CAPTURE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_CAPTURE,
+        async_stop_capture,
+        schema=CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _write_captures(directory: Path, captures: dict[str, bytes]) -> None:
+    """Write captures to files; runs in the executor."""
+    if captures:
+        directory.mkdir(parents=True, exist_ok=True)
+    for path, data in captures.items():
+        Path(path).write_bytes(data)
+
+
+def _coordinators_for_devices(
+    hass: HomeAssistant, device_ids: list[str]
+) -> list[TesmartDataUpdateCoordinator]:
+    """Resolve targeted devices to the coordinators of their config entries."""
+    hub: TesmartHub = hass.data[DOMAIN]
+    device_registry = dr.async_get(hass)
+    coordinators: list[TesmartDataUpdateCoordinator] = []
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            raise ServiceValidationError(f"Unknown device '{device_id}'")
+        coordinators.extend(
+            hub.coordinators[entry_id]
+            for entry_id in device.config_entries
+            if entry_id in hub.coordinators
+        )
+    if not coordinators:
+        raise ServiceValidationError("No loaded TESmart devices targeted")
+    return coordinators
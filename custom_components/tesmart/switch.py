@@ -28,7 +28,7 @@ SWITCHES = (
 
 async def async_setup_entry(hass, entry, async_add_devices):
     """Set up devices based on config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator = hass.data[DOMAIN].coordinators[entry.entry_id]
     async_add_devices(
         TesmartSwitchEntity(
             coordinator=coordinator, entity_description=entity_description
@@ -50,33 +50,33 @@ class TesmartSwitchEntity(TesmartEntity, SwitchEntity):
         self.entity_description = entity_description
         self.entity_category = EntityCategory.CONFIG
         self.name = entity_description.name
+        self._state_fields = frozenset({entity_description.key})
         self._attr_unique_id = (
             f"{coordinator.config_entry.entry_id}_{entity_description.key}"
         )
 
-    def turn_on(self) -> None:
-        """Handle switch on of a TesmartSwitchEntity."""
-        match self.entity_description.key:
-            case "buzzer_enabled":
-                self._client.set_buzzer_muting(False)
-            case "auto_input_detection":
-                self._client.set_auto_input_detection(True)
+    @property
+    def is_on(self) -> bool | None:
+        """Return the configured state, if known."""
+        return getattr(self.coordinator.data, self.entity_description.key)
 
-    def turn_off(self) -> None:
-        """Handle switch off of a TesmartSwitchEntity."""
+    async def async_turn_on(self) -> None:
+        """Handle async switch on of a TesmartSwitchEntity."""
         match self.entity_description.key:
             case "buzzer_enabled":
-                self._client.set_buzzer_muting(True)
+                await self._client.async_set_buzzer_muting(False)
             case "auto_input_detection":
-                self._client.set_auto_input_detection(False)
-
-    async def async_turn_on(self) -> None:
-        """Handle async switch on of a TesmartSwitchEntity."""
-        await self.hass.async_add_executor_job(self.turn_on)
+                await self._client.async_set_auto_input_detection(True)
+        self.coordinator.async_note_command()
 
     async def async_turn_off(self) -> None:
         """Handle async switch off of a TesmartSwitchEntity."""
-        await self.hass.async_add_executor_job(self.turn_off)
+        match self.entity_description.key:
+            case "buzzer_enabled":
+                await self._client.async_set_buzzer_muting(True)
+            case "auto_input_detection":
+                await self._client.async_set_auto_input_detection(False)
+        self.coordinator.async_note_command()
 
     @property
     def _client(self) -> TesmartApiClient:
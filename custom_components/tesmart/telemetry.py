@@ -0,0 +1,107 @@
+"""Per-device I/O performance telemetry."""
+from __future__ import annotations
+
+import statistics
+from bisect import bisect_left
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any
+
+# Upper bounds, in milliseconds, of the round-trip time histogram buckets
+RTT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+# Number of most recent round trips the median is computed over
+RTT_RECENT_SAMPLES = 100
+
+
+class TesmartRttHistogram:
+    """Cumulative round-trip time histogram for one command type."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        """Initialize histogram."""
+        # One bucket per bound, plus one for anything slower
+        self.counts = [0] * (len(RTT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, rtt_ms: float) -> None:
+        """Add a sample."""
+        self.counts[bisect_left(RTT_BUCKETS_MS, rtt_ms)] += 1
+        self.count += 1
+        self.total_ms += rtt_ms
+        self.max_ms = max(self.max_ms, rtt_ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Histogram serialized to a dictionary."""
+        bounds = [f"le_{bound}ms" for bound in RTT_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else None,
+            "max_ms": self.max_ms,
+            "buckets": dict(zip(bounds, self.counts, strict=True)),
+        }
+
+
+class TesmartTelemetry:
+    """Counts and times every operation against one device."""
+
+    def __init__(self) -> None:
+        """Initialize telemetry."""
+        self.rtt: dict[str, TesmartRttHistogram] = {}
+        self.timeouts = 0
+        self.refusals = 0
+        self.errors = 0
+        self.connects = 0
+        self.last_success: datetime | None = None
+        self._recent_rtt_ms: deque[float] = deque(maxlen=RTT_RECENT_SAMPLES)
+
+    @property
+    def reconnects(self) -> int:
+        """Number of times the connection was re-established after the first."""
+        return max(self.connects - 1, 0)
+
+    @property
+    def recent_rtt_ms(self) -> float | None:
+        """Median round-trip time of recent operations, in milliseconds."""
+        if not self._recent_rtt_ms:
+            return None
+        return statistics.median(self._recent_rtt_ms)
+
+    def record_success(self, command: str, rtt_seconds: float) -> None:
+        """Record a completed operation."""
+        rtt_ms = rtt_seconds * 1000
+        if (histogram := self.rtt.get(command)) is None:
+            histogram = self.rtt[command] = TesmartRttHistogram()
+        histogram.record(rtt_ms)
+        self._recent_rtt_ms.append(rtt_ms)
+        self.last_success = datetime.now(UTC)
+
+    def record_timeout(self) -> None:
+        """Record a connect or reply timeout."""
+        self.timeouts += 1
+
+    def record_refusal(self) -> None:
+        """Record a refused connection."""
+        self.refusals += 1
+
+    def record_error(self) -> None:
+        """Record any other communication failure."""
+        self.errors += 1
+
+    def record_connect(self) -> None:
+        """Record an established connection."""
+        self.connects += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Telemetry serialized to a dictionary."""
+        return {
+            "recent_rtt_ms": self.recent_rtt_ms,
+            "timeouts": self.timeouts,
+            "refusals": self.refusals,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "rtt": {command: histogram.as_dict() for command, histogram in self.rtt.items()},
+        }
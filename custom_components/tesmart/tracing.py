@@ -0,0 +1,115 @@
+"""Opt-in tracing of device I/O."""
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from .const import TRACE_BUFFER_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class TesmartSpan:
+    """One timed operation, split into consecutive phases."""
+
+    name: str
+    # Wall clock time the span started, in seconds since the epoch
+    start: float
+    # Consecutive phase durations, in seconds and in order
+    phases: dict[str, float]
+    args: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """Returns the total duration of the span, in seconds."""
+        return sum(self.phases.values())
+
+
+class TesmartPhaseTimer:
+    """Times the consecutive phases of a single operation."""
+
+    __slots__ = ("start", "phases", "parse", "_mark")
+
+    def __init__(self, queue_wait: float | None = None) -> None:
+        """Start timing; `queue_wait` is time already spent before the first phase."""
+        self._mark = time.perf_counter()
+        self.start = time.time()
+        self.phases: dict[str, float] = {}
+        # Frames are decoded while replies are received, so parsing overlaps
+        # the receive phase and is reported separately
+        self.parse = 0.0
+        if queue_wait is not None:
+            self.start -= queue_wait
+            self.phases["queue_wait"] = queue_wait
+
+    def lap(self, phase: str) -> None:
+        """End the current phase, attributing the time since the last lap to it."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._mark
+        self._mark = now
+
+
+class TesmartTracer:
+    """Keeps the most recent spans of one device while enabled."""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE) -> None:
+        """Initialize tracer, disabled."""
+        self.enabled = False
+        self.spans: deque[TesmartSpan] = deque(maxlen=size)
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Start or stop recording; starting discards previously recorded spans."""
+        if enabled and not self.enabled:
+            self.spans.clear()
+        self.enabled = enabled
+
+    def record(self, name: str, timer: TesmartPhaseTimer, **args: Any) -> None:
+        """Record a span from a finished timer."""
+        if timer.parse:
+            args["parse"] = timer.parse
+        self.spans.append(TesmartSpan(name, timer.start, timer.phases, args))
+
+    def as_json(self) -> list[dict[str, Any]]:
+        """Serialize recorded spans to dictionaries."""
+        return [asdict(span) | {"duration": span.duration} for span in self.spans]
+
+
+def chrome_trace(tracers: dict[str, TesmartTracer]) -> dict[str, Any]:
+    """Serialize spans in Chrome trace event format, one thread per device.
+
+    The result loads in chrome://tracing or https://ui.perfetto.dev.
+    """
+    events: list[dict[str, Any]] = []
+    for tid, (device, tracer) in enumerate(tracers.items(), start=1):
+        events.append(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": device}}
+        )
+        for span in tracer.spans:
+            timestamp = span.start * 1_000_000
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "io",
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": tid,
+                    "ts": timestamp,
+                    "dur": span.duration * 1_000_000,
+                    "args": span.args,
+                }
+            )
+            for phase, duration in span.phases.items():
+                events.append(
+                    {
+                        "name": phase,
+                        "cat": "phase",
+                        "ph": "X",
+                        "pid": 1,
+                        "tid": tid,
+                        "ts": timestamp,
+                        "dur": duration * 1_000_000,
+                    }
+                )
+                timestamp += duration * 1_000_000
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
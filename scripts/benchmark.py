@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Measures TesmartApiClient latency and throughput against the simulator.
+
+Runs each client operation repeatedly against an in-process simulated switch
+and reports p50/p99 latency and operations per second, e.g.:
+
+    scripts/benchmark.py --iterations 500 --output bench.json
+    scripts/benchmark.py --baseline bench.json
+
+With --codec, the frame codec is micro-benchmarked instead, per frame.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from simulator import SimulatedSwitch  # noqa: E402
+
+from custom_components.tesmart.api import (  # noqa: E402
+    TesmartApiClient,
+    TesmartApiClientError,
+)
+from custom_components.tesmart.protocol import (  # noqa: E402
+    Command,
+    FrameDecoder,
+    decode_frame,
+    encode_frame,
+)
+
+Operation = Callable[[TesmartApiClient, int], Awaitable[None]]
+
+OPERATIONS: dict[str, Operation] = {
+    "refresh_state": lambda client, _: client.async_refresh_state(),
+    "select_source": lambda client, i: client.async_select_source(i % 2 + 1),
+    "set_buzzer_muting": lambda client, i: client.async_set_buzzer_muting(bool(i % 2)),
+    "set_led_timeout_seconds": lambda client, i: client.async_set_led_timeout_seconds(
+        (0, 10, 30)[i % 3]
+    ),
+    "set_auto_input_detection": lambda client, i: client.async_set_auto_input_detection(
+        bool(i % 2)
+    ),
+}
+
+
+# Frames per codec sample; a sample's time is divided evenly between them
+CODEC_BATCH = 1000
+CODEC_STREAM = b"".join(
+    encode_frame(Command.CURRENT_ACTIVE_INPUT, i % 16) for i in range(CODEC_BATCH)
+)
+
+
+def _encode_frames() -> None:
+    for i in range(CODEC_BATCH):
+        encode_frame(Command.SWITCH_VIDEO, i % 16 + 1)
+
+
+def _decode_frames_individually() -> None:
+    # Frame by frame, as read with readexactly() before the streaming decoder
+    for i in range(0, len(CODEC_STREAM), 6):
+        decode_frame(CODEC_STREAM[i:i + 6])
+
+
+def _decode_frames_streaming() -> None:
+    # A burst of frames arriving in uneven reads
+    decoder = FrameDecoder()
+    for i in range(0, len(CODEC_STREAM), 1024):
+        decoder.feed(CODEC_STREAM[i:i + 1024], lambda command, value: None)
+
+
+CODEC_OPERATIONS: dict[str, Callable[[], None]] = {
+    "encode_frame": _encode_frames,
+    "decode_frame": _decode_frames_individually,
+    "frame_decoder_feed": _decode_frames_streaming,
+}
+
+
+def _measure_codec(operation: Callable[[], None], iterations: int) -> dict[str, float]:
+    samples: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - started) / CODEC_BATCH)
+
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "ops_per_sec": 1 / statistics.fmean(samples),
+    }
+
+
+async def _measure(
+    client: TesmartApiClient, operation: Operation, iterations: int
+) -> dict[str, float]:
+    samples: list[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        op_started = time.perf_counter()
+        # Dropped replies fail status queries; time them all the same
+        with contextlib.suppress(TesmartApiClientError):
+            await operation(client, i)
+        samples.append(time.perf_counter() - op_started)
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "ops_per_sec": iterations / elapsed,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    """Run every selected operation and return results keyed by operation name."""
+    switch = SimulatedSwitch(
+        inputs=args.inputs,
+        response_delay=args.delay,
+        drop_rate=args.drop_rate,
+        seed=0,
+    )
+    await switch.start()
+    client = TesmartApiClient(name="benchmark", ip_address=switch.host, port=switch.port)
+    # Measure every operation against the device; never fail fast
+    client.breaker.failure_threshold = sys.maxsize
+    try:
+        # Warm up: connect and discover the input count outside the measurements
+        with contextlib.suppress(TesmartApiClientError):
+            await client.async_refresh_state()
+        return {
+            name: await _measure(client, OPERATIONS[name], args.iterations)
+            for name in args.operations
+        }
+    finally:
+        await client.async_close()
+        await switch.stop()
+
+
+def _report(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None,
+) -> None:
+    print(f"{'operation':<26}{'p50 ms':>10}{'p99 ms':>10}{'ops/sec':>12}")  # noqa: T201
+    for name, result in results.items():
+        line = (
+            f"{name:<26}{result['p50_ms']:>10.5f}{result['p99_ms']:>10.5f}"
+            f"{result['ops_per_sec']:>12.1f}"
+        )
+        if baseline and name in baseline:
+            change = result["p50_ms"] / baseline[name]["p50_ms"] - 1
+            line += f"  p50 {change:+.1%} vs baseline"
+        print(line)  # noqa: T201
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and report results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--inputs", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated reply delay in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of replies dropped")
+    parser.add_argument(
+        "--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS)
+    )
+    parser.add_argument("--codec", action="store_true", help="benchmark the frame codec")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against earlier JSON results")
+    args = parser.parse_args()
+
+    if args.codec:
+        results = {
+            name: _measure_codec(operation, args.iterations)
+            for name, operation in CODEC_OPERATIONS.items()
+        }
+    else:
+        results = asyncio.run(run(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    _report(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
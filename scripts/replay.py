@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Replays a captured device session over TCP, standing in for the device.
+
+Captures are recorded with the `tesmart.start_capture` and
+`tesmart.stop_capture` services. Connect the integration, a benchmark or a
+test to the replay server as if it were the captured switch, e.g.:
+
+    scripts/replay.py rack-20260101-120000.tscap --port 5000 --speed 10
+
+Frames the device sent are played back with their captured timing, scaled by
+--speed, after the frames the client sent before them have arrived.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import socket
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.tesmart.capture import (  # noqa: E402
+    CaptureDirection,
+    TesmartCaptureRecord,
+    read_capture,
+)
+from custom_components.tesmart.protocol import FRAME_SIZE  # noqa: E402
+
+LOGGER = logging.getLogger("tesmart.replay")
+
+
+class ReplayServer:
+    """In-process TCP server replaying a captured session."""
+
+    def __init__(
+        self,
+        records: Sequence[TesmartCaptureRecord],
+        speed: float = 1.0,
+        loop: bool = False,
+    ) -> None:
+        """Initialize server; `speed` scales playback, e.g. 10 for ten times faster."""
+        self.records = records
+        self.speed = speed
+        self.loop = loop
+
+        self.host = "127.0.0.1"
+        self.port = 0
+        # The session continues where it left off across reconnects, as it was captured
+        self.position = 0
+        self.frames_received = 0
+        self.mismatches = 0
+        self.finished = asyncio.Event()
+
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening; port 0 picks a free port."""
+        self.host = host
+        if port == 0:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+        self.port = port
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        LOGGER.info("Replaying %s frames on %s:%s", len(self.records), host, port)
+
+    async def stop(self) -> None:
+        """Stop listening and drop all clients."""
+        for writer in list(self._writers):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        try:
+            await self._replay(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _replay(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        previous_time = self.records[self.position - 1].time if self.position else 0.0
+        while self.position < len(self.records):
+            record = self.records[self.position]
+            if record.direction is CaptureDirection.SENT:
+                # The client sets the pace of its own frames
+                data = await reader.readexactly(FRAME_SIZE)
+                self.frames_received += 1
+                if data != record.frame:
+                    self.mismatches += 1
+                    LOGGER.warning(
+                        "Frame %s: expected %s, received %s",
+                        self.position, record.frame.hex(" "), data.hex(" "),
+                    )
+            else:
+                # Device frames keep their delay after the frame before them
+                await asyncio.sleep(max(record.time - previous_time, 0.0) / self.speed)
+                writer.write(record.frame)
+                await writer.drain()
+            previous_time = record.time
+            self.position += 1
+            if self.loop and self.position == len(self.records):
+                self.position = 0
+                previous_time = 0.0
+
+        LOGGER.info("Replay finished with %s mismatched frames", self.mismatches)
+        self.finished.set()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    records = read_capture(args.capture.read_bytes())
+    server = ReplayServer(records, speed=args.speed, loop=args.loop)
+    await server.start(args.host, args.port)
+    try:
+        await server.finished.wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    """Replay a capture until it finishes or is interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed factor")
+    parser.add_argument("--loop", action="store_true", help="restart the session when it ends")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
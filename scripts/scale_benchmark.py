@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Measures the integration at scale, with many devices in one Home Assistant.
+
+Boots a Home Assistant test instance, sets up one config entry per simulated
+switch and polls them all repeatedly, reporting setup time, coordinator
+refresh wall time, state writes per poll, event loop lag and executor queue
+depth, e.g.:
+
+    scripts/scale_benchmark.py --devices 100 --output scale.json
+    scripts/scale_benchmark.py --devices 100 --baseline scale.json --max-regression 0.5
+
+With --max-regression, exits with status 1 if a gated metric got worse than
+the baseline by more than that fraction.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant import loader  # noqa: E402
+from homeassistant.const import (  # noqa: E402
+    CONF_IP_ADDRESS,
+    CONF_NAME,
+    CONF_PORT,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.core import Event, HomeAssistant, callback  # noqa: E402
+from homeassistant.helpers import frame  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+from simulator import SimulatedSwitch  # noqa: E402
+
+from custom_components.tesmart.const import DOMAIN  # noqa: E402
+from custom_components.tesmart.hub import TesmartHub  # noqa: E402
+
+# How often the event loop is sampled for lag and executor queue depth
+SAMPLE_INTERVAL = 0.005
+# Metrics, all lower-is-better, that --max-regression fails on; maxima and
+# loop lag are reported only, as they are too noisy on shared CI runners
+GATED_METRICS = (
+    "setup_s",
+    "setup_state_writes",
+    "refresh_p50_ms",
+    "state_writes_per_poll",
+)
+
+
+class LoopMonitor:
+    """Samples event loop lag and executor queue depth in the background."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize monitor."""
+        self._loop = hass.loop
+        self._task: asyncio.Task | None = None
+        self.lags: list[float] = []
+        self.queue_depths: list[int] = []
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._task = self._loop.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            scheduled = self._loop.time() + SAMPLE_INTERVAL
+            await asyncio.sleep(SAMPLE_INTERVAL)
+            # Time the loop was busy with other callbacks past our wakeup
+            self.lags.append(max(self._loop.time() - scheduled, 0.0))
+            # Private, but the only way to see work waiting for an executor thread
+            executor = getattr(self._loop, "_default_executor", None)
+            self.queue_depths.append(executor._work_queue.qsize() if executor else 0)
+
+
+async def run(args: argparse.Namespace) -> dict[str, float]:
+    """Set up and poll all devices, returning results keyed by metric name."""
+    switches = [
+        SimulatedSwitch(inputs=args.inputs, response_delay=args.delay, seed=i)
+        for i in range(args.devices)
+    ]
+    for switch in switches:
+        await switch.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            try:
+                return await _run_in_hass(hass, switches, args)
+            finally:
+                for switch in switches:
+                    await switch.stop()
+
+
+async def _run_in_hass(
+    hass: HomeAssistant, switches: list[SimulatedSwitch], args: argparse.Namespace
+) -> dict[str, float]:
+    # As the pytest plugin's fixtures would, and load the integration from this checkout
+    frame.async_setup(hass)
+    hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+
+    writes = 0
+
+    @callback
+    def count_write(event: Event) -> None:
+        nonlocal writes
+        writes += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+    monitor = LoopMonitor(hass)
+    monitor.start()
+
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Switch {i}",
+            data={
+                CONF_NAME: f"Switch {i}",
+                CONF_IP_ADDRESS: switch.host,
+                CONF_PORT: switch.port,
+            },
+        )
+        for i, switch in enumerate(switches)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(hass.config_entries.async_setup(entry.entry_id) for entry in entries))
+    await hass.async_block_till_done()
+    setup = time.perf_counter() - started
+    setup_writes = writes
+
+    hub: TesmartHub = hass.data[DOMAIN]
+    coordinators = list(hub.coordinators.values())
+    rng = random.Random(0)
+    refreshes: list[float] = []
+    poll_writes: list[int] = []
+    for _ in range(args.polls):
+        # Change sources behind the integration's back, so polls find them
+        for switch in rng.sample(switches, round(len(switches) * args.change_rate)):
+            switch.selected_source = switch.selected_source % args.inputs + 1
+        writes = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+        refreshes.append(time.perf_counter() - started)
+        await hass.async_block_till_done()
+        poll_writes.append(writes)
+
+    monitor.stop()
+    for entry in entries:
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    return {
+        "devices": len(entries),
+        "entities": len(hass.states.async_all()),
+        "setup_s": setup,
+        "setup_state_writes": setup_writes,
+        "refresh_p50_ms": statistics.median(refreshes) * 1000,
+        "refresh_max_ms": max(refreshes) * 1000,
+        "state_writes_per_poll": statistics.fmean(poll_writes),
+        "loop_lag_p99_ms": statistics.quantiles(monitor.lags, n=100, method="inclusive")[98] * 1000,
+        "loop_lag_max_ms": max(monitor.lags) * 1000,
+        "executor_queue_max": max(monitor.queue_depths),
+    }
+
+
+def _report(results: dict[str, float], baseline: dict[str, float] | None) -> None:
+    print(f"{'metric':<24}{'value':>12}")  # noqa: T201
+    for name, value in results.items():
+        line = f"{name:<24}{value:>12.3f}"
+        if baseline and baseline.get(name):
+            change = value / baseline[name] - 1
+            line += f"  {change:+.1%} vs baseline"
+        print(line)  # noqa: T201
+
+
+def _regressions(
+    results: dict[str, float], baseline: dict[str, float], max_regression: float
+) -> list[str]:
+    return [
+        f"{name} regressed {results[name] / baseline[name] - 1:+.1%}"
+        for name in GATED_METRICS
+        if baseline.get(name) and results[name] > baseline[name] * (1 + max_regression)
+    ]
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and report results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=10)
+    parser.add_argument("--inputs", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.0, help="simulated reply delay in seconds")
+    parser.add_argument(
+        "--change-rate", type=float, default=0.1, help="fraction of devices changed before each poll"
+    )
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against earlier JSON results")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="fail if a gated metric is worse than the baseline by more than this fraction",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    _report(results, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if baseline and args.max_regression is not None:
+        if regressions := _regressions(results, baseline, args.max_regression):
+            sys.exit("Regressions past baseline: " + "; ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Emulates a TESmart Hex protocol media switch over TCP.
+
+Useful for exercising the integration without hardware, e.g.:
+
+    scripts/simulator.py --port 5000 --inputs 8 --delay 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+import socket
+from enum import IntEnum
+
+LOGGER = logging.getLogger("tesmart.simulator")
+
+FRAME_SIZE = 6
+FRAME_HEADER = b"\xaa\xbb\x03"
+FRAME_FOOTER = 0xEE
+
+
+class Command(IntEnum):
+    """Hex commands understood by the simulator."""
+
+    SWITCH_VIDEO = 0x01
+    MUTE_BUZZER = 0x02
+    LED_TIMEOUT_SECONDS = 0x03
+    QUERY_ACTIVE_INPUT = 0x10
+    CURRENT_ACTIVE_INPUT = 0x11
+    ENABLE_INPUT_DETECTION = 0x81
+
+
+def frame(command: int, value: int = 0) -> bytes:
+    """Build a Hex protocol frame."""
+    return FRAME_HEADER + bytes((command, value, FRAME_FOOTER))
+
+
+class SimulatedSwitch:
+    """In-process TESmart switch listening on a TCP port."""
+
+    def __init__(
+        self,
+        inputs: int = 4,
+        outputs: int = 1,
+        response_delay: float = 0.0,
+        drop_rate: float = 0.0,
+        refuse_connections: bool = False,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize simulator."""
+        self.inputs = inputs
+        self.outputs = outputs
+        self.response_delay = response_delay
+        self.drop_rate = drop_rate
+        self.refuse_connections = refuse_connections
+
+        self.selected_source = 1
+        self.buzzer_enabled = True
+        self.led_timeout_seconds = 0
+        self.auto_input_detection = False
+
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.frames_received = 0
+        self.connections_accepted = 0
+
+        self._random = random.Random(seed)
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening; port 0 picks a free port."""
+        self.host = host
+        if port == 0:
+            with socket.socket() as sock:
+                sock.bind((host, 0))
+                port = sock.getsockname()[1]
+        self.port = port
+        if not self.refuse_connections:
+            await self._listen()
+        LOGGER.info("Simulated %sx%s switch on %s:%s", self.inputs, self.outputs, host, self.port)
+
+    async def set_refuse_connections(self, refuse_connections: bool) -> None:
+        """Stop or resume listening, so that connection attempts are refused."""
+        self.refuse_connections = refuse_connections
+        if refuse_connections:
+            await self.stop()
+        elif self._server is None:
+            await self._listen()
+
+    async def stop(self) -> None:
+        """Stop listening and drop all clients."""
+        for writer in list(self._writers):
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def press(self, source: int) -> None:
+        """Select a source from the front panel, notifying connected clients."""
+        self.selected_source = source
+        self._broadcast(frame(Command.CURRENT_ACTIVE_INPUT, source - 1))
+
+    async def _listen(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle_client, self.host, self.port
+        )
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections_accepted += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                data = await reader.readexactly(FRAME_SIZE)
+                self.frames_received += 1
+                reply = self._process(data)
+                if reply is None or self._random.random() < self.drop_rate:
+                    continue
+                if self.response_delay:
+                    await asyncio.sleep(self.response_delay)
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _process(self, data: bytes) -> bytes | None:
+        if data[:3] != FRAME_HEADER or data[5] != FRAME_FOOTER:
+            LOGGER.warning("Malformed frame: %s", data.hex(" "))
+            return None
+
+        command, value = data[3], data[4]
+        match command:
+            case Command.SWITCH_VIDEO if 1 <= value <= self.inputs:
+                self.selected_source = value
+                return frame(Command.CURRENT_ACTIVE_INPUT, value - 1)
+            case Command.QUERY_ACTIVE_INPUT:
+                return frame(Command.CURRENT_ACTIVE_INPUT, self.selected_source - 1)
+            case Command.MUTE_BUZZER:
+                self.buzzer_enabled = bool(value)
+            case Command.LED_TIMEOUT_SECONDS:
+                self.led_timeout_seconds = value
+            case Command.ENABLE_INPUT_DETECTION:
+                self.auto_input_detection = bool(value)
+            case _:
+                LOGGER.debug("Ignoring frame: %s", data.hex(" "))
+        return None
+
+    def _broadcast(self, data: bytes) -> None:
+        for writer in self._writers:
+            writer.write(data)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    switch = SimulatedSwitch(
+        inputs=args.inputs,
+        outputs=args.outputs,
+        response_delay=args.delay,
+        drop_rate=args.drop_rate,
+        refuse_connections=args.refuse,
+    )
+    await switch.start(args.host, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await switch.stop()
+
+
+def main() -> None:
+    """Run the simulator until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--inputs", type=int, default=4)
+    parser.add_argument("--outputs", type=int, default=1)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each reply")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of replies to drop")
+    parser.add_argument("--refuse", action="store_true", help="refuse all connections")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
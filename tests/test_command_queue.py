@@ -0,0 +1,130 @@
+"""Tests for the per-device command queue."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.tesmart.command_queue import TesmartCommandQueue
+
+
+class _Device:
+    """Records the operations that reached the device, in order."""
+
+    def __init__(self) -> None:
+        self.ran: list[str] = []
+        self.release = asyncio.Event()
+
+    def operation(self, name: str, wait: bool = False):
+        async def run() -> str:
+            if wait:
+                await self.release.wait()
+            self.ran.append(name)
+            return name
+
+        return run
+
+
+async def _settle() -> None:
+    # Let every submitted task reach its first wait
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_runs_in_submission_order() -> None:
+    """Test operations run one at a time, in the order they were submitted."""
+    queue = TesmartCommandQueue()
+    device = _Device()
+    tasks = [
+        asyncio.create_task(queue.async_run(name, device.operation(name)))
+        for name in ("a", "b", "c")
+    ]
+
+    assert await asyncio.gather(*tasks) == ["a", "b", "c"]
+    assert device.ran == ["a", "b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_coalesces_queued_operations() -> None:
+    """Test reads share the queued operation, while writes replace it."""
+    queue = TesmartCommandQueue()
+    device = _Device()
+    slow = asyncio.create_task(queue.async_run("slow", device.operation("slow", wait=True)))
+    await _settle()
+    reads = [
+        asyncio.create_task(queue.async_run("read", device.operation(f"read{i}")))
+        for i in range(3)
+    ]
+    writes = [
+        asyncio.create_task(queue.async_run("sel", device.operation(f"sel{i}"), replace=True))
+        for i in range(3)
+    ]
+    await _settle()
+    device.release.set()
+
+    assert await asyncio.gather(*reads) == ["read0"] * 3
+    assert await asyncio.gather(*writes) == ["sel2"] * 3
+    assert await slow == "slow"
+    assert device.ran == ["slow", "read0", "sel2"]
+
+
+@pytest.mark.asyncio
+async def test_shares_exceptions() -> None:
+    """Test every merged caller sees the operation's exception."""
+    queue = TesmartCommandQueue()
+    device = _Device()
+
+    async def fail() -> None:
+        raise ValueError("rejected")
+
+    slow = asyncio.create_task(queue.async_run("slow", device.operation("slow", wait=True)))
+    await _settle()
+    callers = [asyncio.create_task(queue.async_run("fail", fail)) for _ in range(2)]
+    await _settle()
+    device.release.set()
+
+    for caller in callers:
+        with pytest.raises(ValueError, match="rejected"):
+            await caller
+    await slow
+
+
+@pytest.mark.asyncio
+async def test_cancelled_submitter_does_not_cancel_merged_callers() -> None:
+    """Test the newest write still runs when the caller that queued it is cancelled."""
+    queue = TesmartCommandQueue()
+    device = _Device()
+    slow = asyncio.create_task(queue.async_run("slow", device.operation("slow", wait=True)))
+    await _settle()
+    first = asyncio.create_task(queue.async_run("sel", device.operation("sel1"), replace=True))
+    await _settle()
+    newest = asyncio.create_task(queue.async_run("sel", device.operation("sel2"), replace=True))
+    await _settle()
+    first.cancel()
+    await _settle()
+    device.release.set()
+
+    assert await newest == "sel2"
+    assert first.cancelled()
+    await slow
+    assert device.ran == ["slow", "sel2"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_sole_submitter_skips_operation() -> None:
+    """Test an operation nobody waits for anymore never reaches the device."""
+    queue = TesmartCommandQueue()
+    device = _Device()
+    slow = asyncio.create_task(queue.async_run("slow", device.operation("slow", wait=True)))
+    await _settle()
+    abandoned = asyncio.create_task(queue.async_run("sel", device.operation("sel")))
+    await _settle()
+    abandoned.cancel()
+    await _settle()
+    device.release.set()
+
+    await slow
+    await queue.async_drain()
+    assert abandoned.cancelled()
+    assert device.ran == ["slow"]